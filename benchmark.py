@@ -0,0 +1,644 @@
+#!/usr/bin/env python3
+"""
+Hindi IPTV Validator Benchmarks - Measures the validator's hot paths offline
+"""
+
+import argparse, copy, http.client, json, os, random, resource, socket, sqlite3, subprocess, sys, tempfile, threading, time, tracemalloc
+from contextlib import ExitStack
+from hindi_validator import (is_hindi_channel, match_hindi_rule, filter_hindi_channels, enhance_channel_metadata,
+                             iter_enhanced_channels, iter_hindi_channels, load_channel_metadata, load_metadata_index,
+                             parse_m3u_metadata, load_channel_store, filter_channels,
+                             validate_hindi_playlist, validate_streams, ProbeOptions, MetadataIndex, HINDI_KEYWORDS,
+                             INTERNATIONAL_HINDI_BRANDS, DEFAULT_WORKERS, DEFAULT_PER_HOST)
+from m3u_stream import iter_m3u_channels
+from vlc_links_generator import render_vlc_html
+from simulated_origin import SimulatedOrigin, OriginProfile, SimulatedProxy
+from proxy_pool import ProxyPool
+from playlist_server import PlaylistServer, parse_query
+from metrics import Metrics
+
+# Words that never match a Hindi rule on their own
+FILLER_WORDS = [
+    "CNN", "BBC", "Fox", "Sports", "News", "HD", "Live", "Channel", "One", "Two",
+    "Movies", "Kids", "Music", "Travel", "Ñoticias", "Télé", "Россия", "FHD", "24x7", "+1"
+]
+
+def legacy_is_hindi_channel(title, metadata_info):
+    """is_hindi_channel as it was before the compiled matcher, kept as the reference"""
+    hindi_keywords = list(HINDI_KEYWORDS)
+    international_hindi_brands = list(INTERNATIONAL_HINDI_BRANDS)
+
+    title_lower = title.lower()
+
+    for keyword in hindi_keywords:
+        if keyword in title_lower:
+            return True
+
+    if metadata_info.get('country') == 'IN':
+        return True
+
+    for brand in international_hindi_brands:
+        if brand in title_lower and ('hindi' in title_lower or 'india' in title_lower):
+            return True
+
+    hindi_indicators = ['hindi', 'india', 'bharat', 'desi']
+    for indicator in hindi_indicators:
+        if indicator in title_lower:
+            return True
+
+    return False
+
+def legacy_enhance_channel_metadata(channels, metadata_config):
+    """enhance_channel_metadata as it was before MetadataIndex, kept as the reference"""
+    for country, country_data in metadata_config.items():
+        if isinstance(country_data, list):
+            for channel_name in country_data:
+                if not channel_name:
+                    continue
+                for url, channel_info in channels.items():
+                    if (channel_info and
+                        channel_info.get("title") and
+                        channel_name.lower() in channel_info["title"].lower()):
+                        channel_info["country"] = country
+                        channel_info["category"] = "General"
+        elif isinstance(country_data, dict):
+            for category, channel_list in country_data.items():
+                for channel_name in channel_list:
+                    if not channel_name:
+                        continue
+                    for url, channel_info in channels.items():
+                        if (channel_info and
+                            channel_info.get("title") and
+                            channel_name.lower() in channel_info["title"].lower()):
+                            channel_info["country"] = country
+                            channel_info["category"] = category
+    return channels
+
+def synthetic_titles(count, seed=0):
+    """Generate channel titles mixing Hindi keywords, brands and filler words"""
+    rng = random.Random(seed)
+    vocabulary = FILLER_WORDS * 4 + [k.title() for k in HINDI_KEYWORDS] + [b.upper() for b in INTERNATIONAL_HINDI_BRANDS]
+    titles = []
+    for i in range(count):
+        words = rng.choices(vocabulary, k=rng.randint(1, 4))
+        # Glue some words together so keywords also appear inside other words
+        glue = "" if rng.random() < 0.1 else " "
+        titles.append(glue.join(words) + f" {i}")
+    return titles
+
+def timed(func, *args):
+    """Run func and return (result, seconds)"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+def bench_matcher(count):
+    """Check the compiled Hindi matcher against the legacy rules and time both"""
+    print(f"🔍 Hindi matcher: {count} titles")
+    titles = synthetic_titles(count)
+    countries = ["IN" if i % 7 == 0 else "Unknown" for i in range(count)]
+
+    legacy, legacy_time = timed(lambda: [legacy_is_hindi_channel(t, {"country": c}) for t, c in zip(titles, countries)])
+    compiled, compiled_time = timed(lambda: [is_hindi_channel(t, {"country": c}) for t, c in zip(titles, countries)])
+
+    mismatches = [t for t, a, b in zip(titles, legacy, compiled) if a != b]
+    for title, country in zip(titles, countries):
+        if (match_hindi_rule(title, {"country": country}) is not None) != legacy_is_hindi_channel(title, {"country": country}):
+            mismatches.append(title)
+
+    channels = synthetic_channels(titles)
+    for info, country in zip(channels.values(), countries):
+        info["country"] = country
+    hindi, filter_time = timed(filter_hindi_channels, channels)
+    if len(hindi) != sum(legacy):
+        mismatches.append("filter_hindi_channels count")
+
+    print(f"   legacy is_hindi_channel:  {legacy_time:.2f}s ({count / legacy_time:,.0f} titles/s)")
+    print(f"   compiled is_hindi_channel: {compiled_time:.2f}s ({count / compiled_time:,.0f} titles/s)")
+    print(f"   filter_hindi_channels:     {filter_time:.2f}s ({count / filter_time:,.0f} titles/s)")
+    print(f"   Hindi titles: {sum(legacy)}")
+    if mismatches:
+        print(f"   ❌ {len(mismatches)} mismatches, e.g. {mismatches[:3]}")
+        return False
+    print("   ✅ Results identical to the legacy rules")
+    return True
+
+def synthetic_metadata(names, seed=0):
+    """Generate a channels.yml-shaped config with overlapping channel names"""
+    rng = random.Random(seed)
+    config = {}
+    for i in range(names):
+        country = f"C{i % 50}"
+        category = ["News", "Sports", "Movies", "Kids", "Music"][i % 5]
+        # Short names nest inside longer ones so "last match wins" matters
+        name = " ".join(rng.choices(FILLER_WORDS, k=rng.randint(1, 2)))
+        if i % 3 == 0:
+            name += f" {i}"
+        config.setdefault(country, {}).setdefault(category, []).append(name)
+    config["IN"] = ["Zee", "Star Plus", "", None, "Aaj Tak"]
+    return config
+
+def synthetic_channels(titles):
+    """Wrap titles in the channel dicts parse_m3u_metadata produces"""
+    return {f"http://bench/{i}": {"title": t, "country": "Unknown", "category": "Unknown", "language": "Unknown"}
+            for i, t in enumerate(titles)}
+
+def bench_metadata(names, count):
+    """Check MetadataIndex against the legacy nested loop and time both"""
+    print(f"📝 Metadata matching: {names} names x {count} channels")
+    config = synthetic_metadata(names)
+    channels = synthetic_channels(synthetic_titles(count))
+
+    legacy, legacy_time = timed(legacy_enhance_channel_metadata, copy.deepcopy(channels), config)
+    index, build_time = timed(MetadataIndex, config)
+    indexed, indexed_time = timed(enhance_channel_metadata, copy.deepcopy(channels), index)
+
+    print(f"   legacy nested loop: {legacy_time:.2f}s")
+    print(f"   index build:        {build_time:.2f}s ({len(index.goto)} states)")
+    print(f"   indexed matching:   {indexed_time:.2f}s ({count / indexed_time:,.0f} channels/s)")
+    if legacy != indexed:
+        print("   ❌ Results differ from the legacy nested loop")
+        return False
+    print("   ✅ Results identical to the legacy nested loop")
+    return True
+
+def bench_startup(names, count=10000):
+    """Time metadata loading from YAML against the compiled snapshot, and the module import"""
+    import yaml
+    print(f"🚀 Startup: {names} metadata names")
+    titles = synthetic_titles(count)
+    with tempfile.TemporaryDirectory() as workdir:
+        metadata_file = os.path.join(workdir, "channels.yml")
+        with open(metadata_file, "w", encoding="utf-8") as f:
+            yaml.safe_dump(synthetic_metadata(names), f, allow_unicode=True)
+
+        fresh, fresh_time = timed(load_metadata_index, metadata_file, False)
+        _, first_time = timed(load_metadata_index, metadata_file)
+        cached, snapshot_time = timed(load_metadata_index, metadata_file)
+        os.utime(metadata_file)
+        _, touched_time = timed(load_metadata_index, metadata_file)
+
+    command = [sys.executable, "-c", "import hindi_validator"]
+    _, import_time = timed(subprocess.run, command)
+
+    print(f"   YAML + index build:   {fresh_time * 1000:.0f} ms")
+    print(f"   first run (+ save):   {first_time * 1000:.0f} ms")
+    print(f"   snapshot load:        {snapshot_time * 1000:.0f} ms")
+    print(f"   after touch (hashed): {touched_time * 1000:.0f} ms")
+    print(f"   python -c 'import hindi_validator': {import_time * 1000:.0f} ms")
+    if [fresh.lookup(t) for t in titles] != [cached.lookup(t) for t in titles]:
+        print("   ❌ Snapshot lookups differ from a fresh index")
+        return False
+    print("   ✅ Snapshot lookups identical to a fresh index")
+    return True
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def write_synthetic_playlist(path, count, url_for=None, repeat_every=None):
+    """Write an M3U with count Hindi-looking channels; url_for(i) picks each URL
+
+    With ``repeat_every`` every so many URLs are listed again at the end
+    under other details, half of them no longer Hindi-looking.
+    """
+    url_for = url_for or (lambda i: f"http://cdn{i % 20}.example/c/{i}/master.m3u8")
+    titles = synthetic_titles(count)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("#EXTM3U\n")
+        for i, title in enumerate(titles):
+            f.write(f'#EXTINF:-1 tvg-id="ch{i}" group-title="Bench",Hindi {title}\n{url_for(i)}\n')
+        for n, i in enumerate(range(0, count, repeat_every or count + 1)):
+            title = f"English Repeat {i}" if n % 2 else f"Hindi Repeat {i}"
+            f.write(f'#EXTINF:-1 tvg-id="dup{i}" tvg-logo="http://logo.example/{i}.png" '
+                    f'group-title="Repeats",{title}\n{url_for(i)}\n')
+
+def bench_pipeline(count, metadata_file="channels.yml"):
+    """Time the parse, metadata and filter stages on a synthetic playlist"""
+    print(f"📋 Parse/metadata/filter pipeline: {count} channels")
+    with tempfile.TemporaryDirectory() as workdir:
+        playlist = os.path.join(workdir, "bench.m3u")
+        write_synthetic_playlist(playlist, count)
+
+        parsed, parse_time = timed(lambda: sum(1 for _ in iter_m3u_channels(playlist)))
+        index = MetadataIndex(load_channel_metadata(metadata_file))
+        enhanced, enhance_time = timed(lambda: sum(1 for _ in iter_enhanced_channels(iter_m3u_channels(playlist), index)))
+        hindi, pipeline_time = timed(lambda: sum(1 for _ in iter_hindi_channels(
+            iter_enhanced_channels(iter_m3u_channels(playlist), index))))
+
+    print(f"   parse:                 {parse_time:.2f}s ({parsed / parse_time:,.0f} channels/s)")
+    print(f"   parse + metadata:      {enhance_time:.2f}s ({enhanced / enhance_time:,.0f} channels/s)")
+    print(f"   parse + meta + filter: {pipeline_time:.2f}s ({parsed / pipeline_time:,.0f} channels/s, {hindi} Hindi)")
+    print(f"   peak RSS: {peak_rss_mb():.0f} MB")
+    return parsed == count
+
+def bench_validate(count, profile, origins=4, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST, timeout=2.0,
+                   runs=1, adaptive_timeouts=True):
+    """Run validate_hindi_playlist end to end against simulated HLS origins
+
+    Later ``runs`` probe everything again, starting from the latency
+    history the earlier runs left in the cache.
+    """
+    print(f"🔧 Validation: {count} channels over {origins} simulated origins "
+          f"({workers} workers, {per_host} per host, {timeout}s timeout)")
+    with tempfile.TemporaryDirectory() as workdir, ExitStack() as stack:
+        servers = [stack.enter_context(SimulatedOrigin(profile, name="localhost")) for _ in range(origins)]
+        playlist = os.path.join(workdir, "bench.m3u")
+        write_synthetic_playlist(playlist, count, lambda i: servers[i % origins].channel_url(i))
+        cache_file = os.path.join(workdir, "cache.db")
+
+        run_times = []
+        for run in range(runs):
+            valid, elapsed = timed(lambda: validate_hindi_playlist(
+                playlist, os.path.join(workdir, "out.m3u"), cache_file=cache_file, force=run > 0,
+                probe=ProbeOptions(workers=workers, per_host=per_host, timeout=timeout, breaker_threshold=0,
+                                   adaptive_timeouts=adaptive_timeouts)))
+            run_times.append(elapsed)
+
+        conn = sqlite3.connect(cache_file)
+        rows = conn.execute("SELECT latency, failure FROM probes").fetchall()
+        conn.close()
+        requests_served = sum(server.stats["requests"] for server in servers)
+
+    latencies = [latency for latency, _ in rows]
+    failures = {}
+    for _, failure in rows:
+        failures[failure or "ok"] = failures.get(failure or "ok", 0) + 1
+
+    print(f"\n📈 Validation benchmark")
+    print(f"   wall time:      {elapsed:.2f}s ({count / elapsed:,.1f} channels/s)")
+    if runs > 1:
+        print(f"   per run:        {', '.join(f'{seconds:.2f}s' for seconds in run_times)}")
+    print(f"   probe latency:  p50 {percentile(latencies, 0.5) * 1000:.0f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.0f} ms")
+    print(f"   outcomes:       {', '.join(f'{k} {v}' for k, v in sorted(failures.items()))}")
+    print(f"   origin requests: {requests_served}")
+    print(f"   peak RSS:       {peak_rss_mb():.0f} MB")
+    return len(rows) == count
+
+def closed_port_url():
+    """A proxy URL nothing listens on, standing in for a dead egress"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+def bench_proxies(count, egress_counts=(1, 2, 4), capacity=2, latency=0.05, workers=32, strategy="round-robin"):
+    """Validate through growing pools of local stand-in proxies
+
+    Every pool also holds one geo-blocked and one dead proxy, so each run
+    exercises egress retries and eviction; throughput should grow with the
+    number of working proxies.
+    """
+    print(f"🌐 Proxy pool: {count} channels, proxies forward {capacity} requests at a time "
+          f"with {latency * 1000:.0f} ms each ({strategy})")
+    ok = True
+    rates = []
+    with SimulatedOrigin(OriginProfile(latency=0.0, jitter=0.0, not_found=0.1)) as origin:
+        urls = [origin.channel_url(i) for i in range(count)]
+        expected = sum(origin.profile.fate(i) == "ok" for i in range(count))
+        for egress in egress_counts:
+            with ExitStack() as stack:
+                working = [stack.enter_context(SimulatedProxy(latency=latency, capacity=capacity))
+                           for _ in range(egress)]
+                blocked = stack.enter_context(SimulatedProxy(blocked=True))
+                pool = ProxyPool([proxy.url for proxy in working] + [blocked.url, closed_port_url()],
+                                 strategy=strategy, evict_after=3)
+                metrics = Metrics()
+                results, elapsed = timed(lambda: validate_streams(urls, workers=workers, per_host=2, timeout=2.0,
+                                                                  metrics=metrics, progress=False,
+                                                                  proxy_pool=pool, breaker_threshold=0))
+            alive = sum(result["working"] for result in results)
+            rates.append(count / elapsed)
+            counters = metrics.counters
+            print(f"   {egress} working prox{'y' if egress == 1 else 'ies'}: {elapsed:.2f}s "
+                  f"({count / elapsed:,.0f} channels/s), {alive}/{expected} alive, "
+                  f"{counters.get('egress_retries', 0)} egress retries, "
+                  f"{counters.get('proxy_evictions', 0)} evictions")
+            ok = ok and alive == expected
+    if len(rates) > 1:
+        print(f"   {rates[-1] / rates[0]:.1f}x throughput from {egress_counts[0]} to {egress_counts[-1]} proxies")
+    print(f"   {'✅' if ok else '❌'} Every live channel found through the pool")
+    return bench_dead_origins(workers=workers, strategy=strategy) and ok
+
+def bench_dead_origins(count=30, workers=32, strategy="round-robin"):
+    """Validate dead HTTPS, hanging and refusing origins through two healthy proxies
+
+    None of these failures is the proxies' doing, so none should be retried
+    through another egress or count towards evicting a proxy.
+    """
+    print(f"🌐 Dead origins: {count} dead HTTPS, hanging and refusing channels behind 2 healthy proxies")
+    profile = OriginProfile(latency=0.0, jitter=0.0, hang=1.0, hang_seconds=3.0)
+    with SimulatedOrigin(profile) as hanging, ExitStack() as stack:
+        proxies = [stack.enter_context(SimulatedProxy(capacity=workers)) for _ in range(2)]
+        dead = closed_port_url()
+        kinds = (lambda i: f"{dead.replace('http://', 'https://')}/c/{i}/master.m3u8",
+                 hanging.channel_url,
+                 lambda i: f"{dead}/c/{i}/master.m3u8")
+        urls = [kinds[i % len(kinds)](i) for i in range(count)]
+        pool = ProxyPool([proxy.url for proxy in proxies], strategy=strategy, evict_after=2)
+        metrics = Metrics()
+        results, elapsed = timed(lambda: validate_streams(urls, workers=workers, per_host=workers, timeout=2.0,
+                                                          metrics=metrics, progress=False, proxy_pool=pool,
+                                                          breaker_threshold=0))
+    failures = {}
+    for result in results:
+        failures[result["failure"]] = failures.get(result["failure"], 0) + 1
+    retries = metrics.counters.get("egress_retries", 0)
+    evictions = metrics.counters.get("proxy_evictions", 0)
+    ok = not any(result["working"] for result in results) and retries == 0 and evictions == 0
+    print(f"   {elapsed:.2f}s, outcomes: {', '.join(f'{k} {v}' for k, v in sorted(failures.items()))}; "
+          f"{retries} egress retries, {evictions} evictions")
+    print(f"   {'✅' if ok else '❌'} Dead origins are never blamed on the proxies")
+    return ok
+
+def traced(func, *args):
+    """Run func and return (result, bytes still allocated by it, peak bytes)
+
+    Tracing slows allocation-heavy code unevenly, so time runs separately.
+    """
+    tracemalloc.start()
+    result = func(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+def bench_memory(count, metadata_file="channels.yml"):
+    """Compare dict-of-dicts channels with the compact ChannelStore on the demo pipeline"""
+    print(f"🧠 Channel memory: {count} channels")
+    index = load_metadata_index(metadata_file)
+
+    def with_dicts(playlist):
+        channels = enhance_channel_metadata(parse_m3u_metadata(playlist), index)
+        hindi = filter_hindi_channels(channels)
+        return channels, hindi, filter_channels(hindi, "IN")
+
+    def with_store(playlist):
+        store = enhance_channel_metadata(load_channel_store(playlist), index)
+        hindi = filter_hindi_channels(store)
+        return store, hindi, filter_channels(hindi, "IN")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        playlist = os.path.join(workdir, "bench.m3u")
+        # Repeated URLs check that both pipelines keep the same (last) entry
+        write_synthetic_playlist(playlist, count, repeat_every=50)
+        dict_time = timed(with_dicts, playlist)[1]
+        store_time = timed(with_store, playlist)[1]
+        dicts, dict_bytes, dict_peak = traced(with_dicts, playlist)
+        dict_results = [len(part) for part in dicts], list(dicts[1].items()), list(dicts[2].items())
+        del dicts
+        store, store_bytes, store_peak = traced(with_store, playlist)
+
+    print(f"   dicts: {dict_time:.2f}s, {dict_bytes / count:,.0f} bytes/channel held, peak {dict_peak / 1e6:.0f} MB")
+    print(f"   store: {store_time:.2f}s, {store_bytes / count:,.0f} bytes/channel held, peak {store_peak / 1e6:.0f} MB")
+    print(f"   {dict_bytes / store_bytes:.1f}x less memory held")
+    if dict_results != ([len(part) for part in store], list(store[1].items()), list(store[2].items())):
+        print("   ❌ Store results differ from the dict pipeline")
+        return False
+    print("   ✅ Store results identical to the dict pipeline")
+    return True
+
+def bench_html(count):
+    """Render the VLC links page at two sizes to check it grows linearly"""
+    print(f"📄 VLC links page: {count // 10} and {count} channels")
+    categories = ["News", "Entertainment", "Movies", "Music", "Kids", "Sports", "Religious"]
+    sizes = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in (count // 10, count):
+            channels = synthetic_channels(synthetic_titles(n))
+            for i, info in enumerate(channels.values()):
+                info["category"] = categories[i % len(categories)]
+            path = os.path.join(workdir, "page.html")
+            def render():
+                with open(path, "w", encoding="utf-8") as f:
+                    render_vlc_html(channels, f)
+            _, render_time = timed(render)
+            size = os.path.getsize(path)
+            sizes.append((n, render_time, size))
+            print(f"   {n:>8} channels: {render_time:.2f}s, {size / 1e6:.1f} MB ({size / n:.0f} bytes/channel)")
+    (small, small_time, small_size), (large, large_time, large_size) = sizes
+    print(f"   growth for {large // small}x channels: {large_time / small_time:.1f}x time, "
+          f"{large_size / small_size:.1f}x size")
+    return large_size / small_size < (large / small) * 1.2
+
+def bench_serve(count, clients=8, requests_per_client=500, revalidate=0.5):
+    """Query the playlist server with keep-alive clients over a mix of slices
+
+    A share of the requests send back the ETag they were given, as polling
+    IPTV players do, and should get 304s. The cost of rendering a slice on
+    every request is measured alongside for comparison.
+    """
+    print(f"🌐 Playlist server: {count} channels, {clients} clients x {requests_per_client} requests")
+    countries = ["IN", "US", "GB", "AE", "CA"]
+    categories = ["News", "Entertainment", "Movies", "Music", "Kids", "Sports", "Religious"]
+    channels = synthetic_channels(synthetic_titles(count))
+    for i, info in enumerate(channels.values()):
+        info["country"] = countries[i % len(countries)]
+        info["category"] = categories[i % len(categories)]
+        info["language"] = "Hindi"
+    paths = (["/playlist.m3u", "/playlist.json?country=IN"] +
+             [f"/playlist.m3u?category={category}" for category in categories] +
+             ["/playlist.m3u?country=IN&category=News,Sports", "/playlist.json?category=Music&country=US"])
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results_file = os.path.join(workdir, "results.json")
+        with open(results_file, "w", encoding="utf-8") as f:
+            json.dump(channels, f)
+        server = PlaylistServer(results_file, port=0).start()
+        host, port = server.httpd.server_address[:2]
+        catalog = server.catalog
+        counts = {200: 0, 304: 0}
+        bad = []
+        lock = threading.Lock()
+
+        def client(seed):
+            rng = random.Random(seed)
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            etags = {}
+            local = {200: 0, 304: 0}
+            for _ in range(requests_per_client):
+                path = rng.choice(paths)
+                headers = {"Accept-Encoding": "gzip"}
+                if path in etags and rng.random() < revalidate:
+                    headers["If-None-Match"] = etags[path]
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status not in local:
+                    bad.append((path, response.status))
+                    continue
+                local[response.status] += 1
+                etags[path] = response.getheader("ETag")
+            conn.close()
+            with lock:
+                for status, n in local.items():
+                    counts[status] += n
+
+        threads = [threading.Thread(target=client, args=(seed,)) for seed in range(clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        server.stop()
+
+    total = clients * requests_per_client
+    query = parse_query("country=IN&category=News,Sports")
+    _, render_time = timed(lambda: [catalog._render("m3u", query) for _ in range(10)])
+    print(f"   {total / elapsed:,.0f} requests/s, {counts[304] / total:.0%} answered 304 Not Modified")
+    print(f"   rendering a slice per request would cost {render_time / 10 * 1000:.1f} ms each")
+    if bad:
+        print(f"   ❌ {len(bad)} unexpected responses, e.g. {bad[0]}")
+        return False
+    print("   ✅ Every request answered 200 or 304")
+    return True
+
+def bench_changes(count, churn=0.01, workers=DEFAULT_WORKERS):
+    """Validate three times and compare what the change feed carries with the full output
+
+    The second run sees nothing new and must leave the output untouched.
+    Before the third, ``churn`` of the channels are dropped from the
+    playlist, as many new ones added, and as many dead ones come back.
+    """
+    print(f"🔄 Change feed: {count} channels, {churn:.0%} churn between runs")
+    profile = OriginProfile(latency=0.0, jitter=0.0, not_found=0.1)
+    with tempfile.TemporaryDirectory() as workdir, SimulatedOrigin(profile, name="localhost") as origin:
+        playlist = os.path.join(workdir, "bench.m3u")
+        output_file = os.path.join(workdir, "out.m3u")
+        changes_file = os.path.join(workdir, "out.m3u.changes.jsonl")
+
+        def run(change_feed=True):
+            return timed(lambda: validate_hindi_playlist(
+                playlist, output_file, cache_file=os.path.join(workdir, "cache.db"), force=True,
+                probe=ProbeOptions(workers=workers, per_host=workers, breaker_threshold=0),
+                change_feed=change_feed))[1]
+
+        write_synthetic_playlist(playlist, count, origin.channel_url)
+        run()
+        first_feed = os.path.getsize(changes_file)
+        written_at = os.stat(output_file).st_mtime_ns
+        quiet_time = run()
+        untouched = os.stat(output_file).st_mtime_ns == written_at and os.path.getsize(changes_file) == first_feed
+
+        # Drop the first channels, add as many new ones at the end, and let some dead ones recover
+        churned = int(count * churn)
+        write_synthetic_playlist(playlist, count + churned, origin.channel_url)
+        with open(playlist, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        with open(playlist, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines[:1] + lines[1 + 2 * churned:]) + "\n")
+        profile.not_found -= churn
+        churn_time = run()
+        with open(changes_file, "r", encoding="utf-8") as f:
+            f.seek(first_feed)
+            kinds = [json.loads(line)["change"] for line in f]
+        feed_bytes = os.path.getsize(changes_file) - first_feed
+        output_bytes = os.path.getsize(output_file)
+        full_time = run(change_feed=False)
+
+    summary = ", ".join(f"{kinds.count(kind)} {kind}" for kind in dict.fromkeys(kinds))
+    print(f"\n📈 Change feed benchmark")
+    print(f"   unchanged run: {quiet_time:.2f}s, output {'left untouched' if untouched else 'rewritten'}")
+    print(f"   churned run:   {churn_time:.2f}s, {summary}")
+    print(f"   feed:          {feed_bytes / 1000:,.1f} kB against a {output_bytes / 1000:,.1f} kB output "
+          f"({output_bytes / max(feed_bytes, 1):.0f}x less to sync)")
+    print(f"   without feed:  {full_time:.2f}s")
+    ok = untouched and bool(kinds)
+    print(f"   {'✅' if ok else '❌'} Unchanged runs leave the output alone; churn shows up in the feed")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hindi IPTV Validator Benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    matcher_parser = subparsers.add_parser("matcher", help="Hindi title matcher")
+    matcher_parser.add_argument("--count", type=int, default=1000000, help="Number of titles")
+
+    metadata_parser = subparsers.add_parser("metadata", help="Metadata name matching")
+    metadata_parser.add_argument("--names", type=int, default=2000, help="Number of metadata names")
+    metadata_parser.add_argument("--count", type=int, default=10000, help="Number of channels")
+
+    startup_parser = subparsers.add_parser("startup", help="Metadata snapshot and import time")
+    startup_parser.add_argument("--names", type=int, default=20000, help="Number of metadata names")
+
+    pipeline_parser = subparsers.add_parser("pipeline", help="Parse, metadata and filter stages")
+    pipeline_parser.add_argument("--count", type=int, default=100000, help="Number of channels")
+    pipeline_parser.add_argument("--metadata", default="channels.yml", help="Channel metadata YAML file")
+
+    memory_parser = subparsers.add_parser("memory", help="Channel record memory, dicts against ChannelStore")
+    memory_parser.add_argument("--count", type=int, default=200000, help="Number of channels")
+    memory_parser.add_argument("--metadata", default="channels.yml", help="Channel metadata YAML file")
+
+    html_parser = subparsers.add_parser("html", help="VLC links page rendering")
+    html_parser.add_argument("--count", type=int, default=50000, help="Number of channels")
+
+    changes_parser = subparsers.add_parser("changes", help="Change feed size and skipped rewrites across runs")
+    changes_parser.add_argument("--count", type=int, default=2000, help="Number of channels")
+    changes_parser.add_argument("--churn", type=float, default=0.01, help="Share of channels changing between runs")
+
+    serve_parser = subparsers.add_parser("serve", help="Playlist server requests/s with conditional requests")
+    serve_parser.add_argument("--count", type=int, default=20000, help="Number of channels")
+    serve_parser.add_argument("--clients", type=int, default=8, help="Concurrent keep-alive clients")
+    serve_parser.add_argument("--requests", type=int, default=500, help="Requests per client")
+
+    validate_parser = subparsers.add_parser("validate", help="End-to-end validation against simulated origins")
+    validate_parser.add_argument("--count", type=int, default=1000, help="Number of channels")
+    validate_parser.add_argument("--origins", type=int, default=4, help="Number of simulated origin hosts")
+    validate_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Validator workers")
+    validate_parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="Validator per-host limit")
+    validate_parser.add_argument("--timeout", type=float, default=2.0, help="Validator probe timeout in seconds")
+    validate_parser.add_argument("--latency", type=float, default=0.02, help="Origin response latency in seconds")
+    validate_parser.add_argument("--not-found", type=float, default=0.1, help="Share of channels answering 404")
+    validate_parser.add_argument("--forbidden", type=float, default=0.05, help="Share of channels answering 403")
+    validate_parser.add_argument("--hang", type=float, default=0.0, help="Share of channels that never answer in time")
+    validate_parser.add_argument("--slow", type=float, default=0.05, help="Share of channels with slow segments")
+    validate_parser.add_argument("--slow-seconds", type=float, default=0.5, help="Extra delay for slow segments")
+    validate_parser.add_argument("--english", type=float, default=0.0, help="Share of channels with English-tagged audio")
+    validate_parser.add_argument("--runs", type=int, default=1, help="Validate this many times, keeping latency history")
+    validate_parser.add_argument("--fixed-timeout", action="store_true", help="Do not learn per-host timeouts")
+
+    proxies_parser = subparsers.add_parser("proxies", help="Validation through pools of local stand-in proxies")
+    proxies_parser.add_argument("--count", type=int, default=400, help="Number of channels")
+    proxies_parser.add_argument("--egress", type=int, nargs="+", default=[1, 2, 4], help="Working proxy counts to try")
+    proxies_parser.add_argument("--capacity", type=int, default=2, help="Requests each proxy forwards at once")
+    proxies_parser.add_argument("--latency", type=float, default=0.05, help="Delay each proxy adds per request")
+    proxies_parser.add_argument("--strategy", choices=["round-robin", "least-loaded"], default="round-robin",
+                                help="Proxy pool strategy")
+
+    args = parser.parse_args()
+
+    if args.benchmark == "matcher":
+        ok = bench_matcher(args.count)
+    elif args.benchmark == "metadata":
+        ok = bench_metadata(args.names, args.count)
+    elif args.benchmark == "startup":
+        ok = bench_startup(args.names)
+    elif args.benchmark == "pipeline":
+        ok = bench_pipeline(args.count, args.metadata)
+    elif args.benchmark == "memory":
+        ok = bench_memory(args.count, args.metadata)
+    elif args.benchmark == "html":
+        ok = bench_html(args.count)
+    elif args.benchmark == "changes":
+        ok = bench_changes(args.count, args.churn)
+    elif args.benchmark == "serve":
+        ok = bench_serve(args.count, args.clients, args.requests)
+    elif args.benchmark == "proxies":
+        ok = bench_proxies(args.count, args.egress, args.capacity, args.latency, strategy=args.strategy)
+    elif args.benchmark == "validate":
+        profile = OriginProfile(latency=args.latency, not_found=args.not_found, forbidden=args.forbidden,
+                                hang=args.hang, slow=args.slow, slow_seconds=args.slow_seconds, english=args.english,
+                                hang_seconds=args.timeout * 3)
+        ok = bench_validate(args.count, profile, origins=args.origins, workers=args.workers,
+                            per_host=args.per_host, timeout=args.timeout, runs=args.runs,
+                            adaptive_timeouts=not args.fixed_timeout)
+
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Change Feed - Diffs each run's working channels against the last and logs the changes
+"""
+
+import json, os, time
+
+# Fields that differ on every run without the channel changing
+VOLATILE_FIELDS = ("startup",)
+
+# Fields compared as sets: reordering them is not a change
+UNORDERED_FIELDS = ("mirrors",)
+
+CHANGE_KINDS = ("added", "removed", "recovered", "changed")
+
+def state_path(output_file):
+    """Default location of the previous run's result set for an output file"""
+    return output_file + ".state.json"
+
+def feed_path(output_file):
+    """Default change feed location for an output file"""
+    return output_file + ".changes.jsonl"
+
+def _comparable(info):
+    comparable = {key: value for key, value in info.items() if key not in VOLATILE_FIELDS}
+    for key in UNORDERED_FIELDS:
+        if isinstance(comparable.get(key), list):
+            comparable[key] = sorted(comparable[key])
+    return comparable
+
+def diff_channels(previous, previous_dropped, working, reasons):
+    """Change records turning one run's working channels into the next's
+
+    ``previous`` and ``working`` map URLs to channel records;
+    ``previous_dropped`` holds the URLs the last run saw but did not output.
+    A working channel is "recovered" if the last run dropped it and "added"
+    if it had never been seen. ``reasons`` says why each URL that stopped
+    being output was dropped; a URL without one left the playlist.
+    """
+    changes = []
+    for url, info in working.items():
+        old = previous.get(url)
+        if old is None:
+            kind = "recovered" if url in previous_dropped else "added"
+            changes.append({"change": kind, "url": url, "title": info.get("title"), "channel": info})
+            continue
+        old_fields, new_fields = _comparable(old), _comparable(info)
+        fields = {key: {"old": old_fields.get(key), "new": new_fields.get(key)}
+                  for key in old_fields.keys() | new_fields.keys() if old_fields.get(key) != new_fields.get(key)}
+        if fields:
+            changes.append({"change": "changed", "url": url, "title": info.get("title"),
+                            "fields": dict(sorted(fields.items()))})
+    for url, info in previous.items():
+        if url not in working:
+            changes.append({"change": "removed", "url": url, "title": info.get("title"),
+                            "reason": reasons.get(url, "missing")})
+    return changes
+
+class ChangeFeed:
+    """Keeps an output's last result set and appends what changed since to a JSONL feed
+
+    The previous run's working channels, the URLs it dropped and the digest
+    of the output it wrote are kept in a state file next to the output.
+    ``compare`` diffs a new result set against them for the feed; whether
+    the output is rewritten depends only on ``digest`` (see write_channels),
+    since records can change in fields an M3U never shows. ``commit``
+    appends the changes, stamped with the run time, to the feed and saves
+    the new state.
+    """
+
+    def __init__(self, output_file, path=None, state_file=None):
+        self.path = path or feed_path(output_file)
+        self.state_file = state_file or state_path(output_file)
+        self.state = self._load()
+
+    def _load(self):
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            print(f"⚠️  Ignoring unreadable change state {self.state_file}")
+            return None
+        state["dropped"] = set(state.get("dropped", ()))
+        return state
+
+    @property
+    def first_run(self):
+        return self.state is None
+
+    def compare(self, working, dropped, reasons=None):
+        """Change records from the last committed result set to ``working``"""
+        previous = self.state["working"] if self.state else {}
+        previous_dropped = self.state["dropped"] if self.state else set()
+        return diff_channels(previous, previous_dropped, working, reasons or {})
+
+    @property
+    def digest(self):
+        """SHA-256 of the output the last run wrote, or None"""
+        return self.state.get("digest") if self.state else None
+
+    def commit(self, changes, working, dropped, digest):
+        """Append changes to the feed and remember this result set for the next run"""
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        if changes:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for change in changes:
+                    f.write(json.dumps({"time": stamp, **change}, ensure_ascii=False) + "\n")
+        state = {"digest": digest, "saved_at": stamp, "working": dict(working.items()),
+                 "dropped": sorted(set(dropped) - working.keys())}
+        temp_file = f"{self.state_file}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp_file, self.state_file)
+        state["dropped"] = set(state["dropped"])
+        self.state = state
+
+def summarize_changes(changes):
+    """{kind: count} for every kind of change"""
+    counts = dict.fromkeys(CHANGE_KINDS, 0)
+    for change in changes:
+        counts[change["change"]] += 1
+    return counts
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Channel Merge - Groups entries from several playlists into logical channels with mirror URLs
+"""
+
+import re
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+# Query parameters that carry per-session tokens rather than pick a stream
+TOKEN_PARAMS = {
+    "token", "tok", "auth", "key", "sig", "signature", "hdnts", "hdnea", "hdntl", "st", "e", "exp",
+    "expires", "wmsauthsign", "hash", "session", "sessionid", "sid", "ts", "t", "_"
+}
+
+# Mirror domains that serve the same content under another name
+DOMAIN_ALIASES = {"akamaihd.net": "akamaized.net"}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+TITLE_NOISE = re.compile(r"\[[^\]]*\]|\([^)]*\)|\b(?:hd|sd|fhd|uhd|4k|\d{3,4}p|backup|alt|mirror)\b")
+NON_WORD = re.compile(r"[^\w]+")
+
+def canonical_url(url):
+    """Reduce a stream URL to a key shared by its trivially different copies
+
+    The scheme, default ports, ``www.``, token query parameters, parameter
+    order, fragments and repeated slashes are ignored, and known mirror
+    domains (akamaihd.net/akamaized.net, with Akamai's ``-lh`` suffix)
+    are folded together.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    for alias, domain in DOMAIN_ALIASES.items():
+        if host.endswith("." + alias):
+            host = host[:-len(alias)] + domain
+    if host.endswith(".akamaized.net"):
+        label, rest = host.split(".", 1)
+        host = (label[:-3] if label.endswith("-lh") else label) + "." + rest
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in TOKEN_PARAMS)
+    return host + path + ("?" + urlencode(query) if query else "")
+
+def normalize_title(title):
+    """Lowercase a channel title and drop tags, quality markers and punctuation"""
+    title = TITLE_NOISE.sub(" ", title.lower())
+    return " ".join(NON_WORD.sub(" ", title).split())
+
+def group_mirrors(entries):
+    """Group (url, info) entries into logical channels
+
+    Entries join the same channel when they share a tvg-id, a normalized
+    title or a canonical URL. Yields ``(primary_url, info)`` in order of
+    each channel's first appearance, where ``info`` is the first entry's
+    info with a ``mirrors`` list holding the other distinct URLs. Grouping
+    needs every entry, so the input is consumed before anything is yielded.
+    """
+    parent = {}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def union(a, b):
+        parent.setdefault(a, a)
+        parent.setdefault(b, b)
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    members = []
+    for url, info in entries:
+        keys = [("url", canonical_url(url))]
+        title = normalize_title(info.get("title", ""))
+        if title:
+            keys.append(("title", title))
+        if info.get("tvg_id"):
+            keys.append(("id", info["tvg_id"].lower()))
+        for key in keys:
+            union(keys[0], key)
+        members.append((keys[0], url, info))
+
+    groups = {}
+    for key, url, info in members:
+        group = groups.setdefault(find(key), {"url": url, "info": info, "seen": {key}, "mirrors": []})
+        if key not in group["seen"]:
+            group["seen"].add(key)
+            group["mirrors"].append(url)
+
+    for group in groups.values():
+        group["info"]["mirrors"] = group["mirrors"]
+        yield group["url"], group["info"]
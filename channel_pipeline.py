@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Channel Pipeline - Runs the playlist pipeline once and renders every output from its result
+
+By default the validation stage is the demo's simulation (as in the VLC
+links scripts): no stream is actually probed. Pass ``validate_into`` (or
+``--validate`` on the command line) to probe the streams for real.
+"""
+
+import json
+from hindi_validator import DEFAULT_CACHE_FILE, validate_hindi_playlist, write_channels
+from hindi_validator_demo import demo_working_channels
+from vlc_links_generator import generate_vlc_links
+from simple_vlc_links import create_direct_links
+
+class ChannelPipeline:
+    """Parses, enriches, filters and validates a playlist once, on first use
+
+    Every renderer reads ``channels``, so producing several outputs does not
+    re-parse the playlist or reload the metadata. ``results_file`` loads the
+    JSON output of an earlier validator run instead of running the pipeline.
+
+    Validation is simulated unless ``validate_into`` is given: then the
+    streams are probed by validate_hindi_playlist (with ``probe`` options,
+    the probe cache in ``cache_file`` and a journal), and its JSON output
+    is saved to ``validate_into`` for later ``results_file`` runs.
+    """
+
+    def __init__(self, input_file=None, metadata_file="channels.yml", country=None, category=None,
+                 results_file=None, validate_into=None, probe=None, cache_file=DEFAULT_CACHE_FILE):
+        if not input_file and not results_file:
+            raise ValueError("need an input playlist or a results file")
+        self.input_file = input_file
+        self.metadata_file = metadata_file
+        self.country = country
+        self.category = category
+        self.results_file = results_file
+        self.validate_into = validate_into
+        self.probe = probe
+        self.cache_file = cache_file
+        self._channels = None
+
+    @property
+    def channels(self):
+        if self._channels is None:
+            if self.results_file:
+                with open(self.results_file, "r", encoding="utf-8") as f:
+                    self._channels = json.load(f)
+                print(f"📥 Loaded {len(self._channels)} channels from {self.results_file}")
+            elif self.validate_into:
+                self._channels = validate_hindi_playlist(self.input_file, self.validate_into, self.metadata_file,
+                                                         self.country, self.category, output_format="json",
+                                                         probe=self.probe, cache_file=self.cache_file)
+            else:
+                self._channels = demo_working_channels(self.input_file, self.metadata_file,
+                                                       self.country, self.category)
+        return self._channels
+
+    def write_m3u(self, output_file):
+        write_channels(self.channels, output_file, "m3u")
+        print(f"💾 Saved {len(self.channels)} channels to {output_file}")
+
+    def write_json(self, output_file):
+        write_channels(self.channels, output_file, "json")
+        print(f"💾 Saved {len(self.channels)} channels to {output_file}")
+
+    def write_html(self, html_file="vlc_hindi_channels.html", m3u_file="hindi_channels_vlc.m3u", open_browser=False):
+        return generate_vlc_links(self.input_file, self.metadata_file, channels=self.channels,
+                                  html_file=html_file, m3u_file=m3u_file, open_browser=open_browser)
+
+    def write_links(self, links_file="vlc_direct_links.txt", m3u_file="hindi_channels_direct.m3u"):
+        return create_direct_links(self.input_file, self.metadata_file, channels=self.channels,
+                                   links_file=links_file, m3u_file=m3u_file)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render several playlist outputs from one pipeline run. "
+                                     "Stream validation is simulated (demo mode) unless --validate is given.")
+    parser.add_argument("input_file", nargs="?", help="Input M3U file")
+    parser.add_argument("--results", help="Render the JSON output of an earlier validator run instead")
+    parser.add_argument("--validate", metavar="RESULTS_JSON",
+                        help="Probe the streams for real instead of simulating it, saving the results "
+                             "as JSON here (reusable with --results)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_FILE,
+                        help=f"Probe result cache for --validate (default: {DEFAULT_CACHE_FILE})")
+    parser.add_argument("--metadata", help="Channel metadata YAML file", default="channels.yml")
+    parser.add_argument("--country", help="Filter by country")
+    parser.add_argument("--category", help="Filter by category (News, Sports, Entertainment, etc.)")
+    parser.add_argument("--m3u", help="Write the playlist as M3U to this file")
+    parser.add_argument("--json", help="Write the playlist as JSON to this file")
+    parser.add_argument("--html", help="Write the VLC links page to this file (plus hindi_channels_vlc.m3u)")
+    parser.add_argument("--links", help="Write plain direct links to this file (plus hindi_channels_direct.m3u)")
+
+    args = parser.parse_args()
+    if not args.input_file and not args.results:
+        parser.error("give an input file or --results")
+    if args.validate and args.results:
+        parser.error("--validate probes an input file; it cannot be combined with --results")
+    if not (args.m3u or args.json or args.html or args.links):
+        parser.error("choose at least one output: --m3u, --json, --html or --links")
+
+    pipeline = ChannelPipeline(args.input_file, args.metadata, args.country, args.category, results_file=args.results,
+                               validate_into=args.validate, cache_file=args.cache)
+    if args.m3u:
+        pipeline.write_m3u(args.m3u)
+    if args.json:
+        pipeline.write_json(args.json)
+    if args.html:
+        pipeline.write_html(args.html)
+    if args.links:
+        pipeline.write_links(args.links)
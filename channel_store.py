@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Channel Store - Compact columnar storage for very large playlists
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+# Channel fields in the order parse_m3u_metadata's dicts hold them
+FIELDS = ("title", "country", "category", "language", "tvg_id", "tvg_country", "tvg_language", "group_title", "tvg_logo")
+
+# Fields with few distinct values are stored as codes into a per-field table
+CODED_FIELDS = ("country", "category", "language", "tvg_country", "tvg_language", "group_title")
+
+class _TextColumn:
+    """Strings packed into one UTF-8 buffer with end offsets; empty means absent"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array("I")
+        # Values changed after being appended; the buffer itself is never rewritten
+        self.replaced = {}
+
+    def append(self, value):
+        if value:
+            self.append_bytes(value.encode("utf-8"))
+        else:
+            self.ends.append(len(self.data))
+
+    def append_bytes(self, encoded):
+        self.data += encoded
+        end = len(self.data)
+        if end > 0xFFFFFFFF and self.ends.typecode == "I":
+            self.ends = array("Q", self.ends)
+        self.ends.append(end)
+
+    def raw(self, index):
+        return self.data[self.ends[index - 1] if index else 0:self.ends[index]]
+
+    def get(self, index):
+        if self.replaced and index in self.replaced:
+            return self.replaced[index]
+        return self.raw(index).decode("utf-8") or None
+
+    def set(self, index, value):
+        self.replaced[index] = value or None
+
+class _CodedColumn:
+    """Repeated strings stored once, with a small integer code per channel"""
+
+    def __init__(self):
+        self.values = [None]
+        self.lookup = {None: 0}
+        self.codes = array("H")
+
+    def code(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+            if code > 0xFFFF and self.codes.typecode == "H":
+                self.codes = array("I", self.codes)
+        return code
+
+    def append(self, value):
+        self.codes.append(self.code(value))
+
+    def get(self, index):
+        return self.values[self.codes[index]]
+
+    def set(self, index, value):
+        self.codes[index] = self.code(value)
+
+    def matching(self, predicate):
+        """The set of codes whose value satisfies predicate"""
+        return {code for code, value in enumerate(self.values) if value is not None and predicate(value)}
+
+class ChannelStore:
+    """Channels held column by column instead of as one dict per URL
+
+    URLs, titles, tvg ids and logos are packed into UTF-8 buffers; country,
+    category, language and the other low-variety attributes are stored as
+    codes into shared value tables. Any other keys are kept in a sparse
+    per-channel dict. A duplicate URL keeps its first position but takes
+the later entry's fields, as in parse_m3u_metadata's dict. ``info(i)``
+    builds the familiar channel dict on demand; filters return ChannelView
+    index lists rather than copies.
+    """
+
+    def __init__(self):
+        self.urls = _TextColumn()
+        self.columns = {field: _CodedColumn() if field in CODED_FIELDS else _TextColumn() for field in FIELDS}
+        self.extras = {}
+        self.duplicates = 0
+        self._coded = [(field, column) for field, column in self.columns.items() if field in CODED_FIELDS]
+        self._texts = [(field, column.append) for field, column in self.columns.items() if field not in CODED_FIELDS]
+        # Open-addressing table of channel indexes keyed by URL hash, for deduplication
+        self._slots = array("i", [-1]) * 8
+
+    @classmethod
+    def from_entries(cls, entries):
+        store = cls()
+        for url, info in entries:
+            store.add(url, info)
+        return store
+
+    def __len__(self):
+        return len(self.urls.ends)
+
+    def _slot(self, url, encoded):
+        mask = len(self._slots) - 1
+        slot = hash(url) & mask
+        while True:
+            index = self._slots[slot]
+            if index < 0 or self.urls.raw(index) == encoded:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _grow(self):
+        self._slots = array("i", [-1]) * (len(self._slots) * 2)
+        for index in range(len(self)):
+            raw = self.urls.raw(index)
+            self._slots[self._slot(raw.decode("utf-8"), raw)] = index
+
+    def find(self, url):
+        """Index of a URL in the store, or None"""
+        index = self._slots[self._slot(url, url.encode("utf-8"))]
+        return index if index >= 0 else None
+
+    def add(self, url, info):
+        """Append a channel; returns its index (a duplicate URL replaces the earlier entry's fields)"""
+        encoded = url.encode("utf-8")
+        slot = self._slot(url, encoded)
+        if self._slots[slot] >= 0:
+            self.duplicates += 1
+            return self._replace(self._slots[slot], info)
+        index = len(self)
+        self.urls.append_bytes(encoded)
+        self._slots[slot] = index
+        for field, column in self._coded:
+            value = info.get(field)
+            code = column.lookup.get(value)
+            if code is None:
+                code = column.code(value)
+            column.codes.append(code)
+        for field, append in self._texts:
+            append(info.get(field))
+        if not info.keys() <= self.columns.keys():
+            self.extras[index] = {key: value for key, value in info.items() if key not in self.columns}
+        if len(self) * 2 > len(self._slots):
+            self._grow()
+        return index
+
+    def _replace(self, index, info):
+        for field, column in self.columns.items():
+            column.set(index, info.get(field))
+        extras = {key: value for key, value in info.items() if key not in self.columns}
+        if extras:
+            self.extras[index] = extras
+        else:
+            self.extras.pop(index, None)
+        return index
+
+    def url(self, index):
+        return self.urls.get(index)
+
+    def get(self, index, field):
+        column = self.columns.get(field)
+        if column is None:
+            return self.extras.get(index, {}).get(field)
+        return column.get(index)
+
+    def set(self, index, field, value):
+        """Change one field of a channel"""
+        column = self.columns.get(field)
+        if column is None:
+            self.extras.setdefault(index, {})[field] = value
+        else:
+            column.set(index, value)
+
+    def info(self, index):
+        """The channel's fields as a fresh dict, as parse_m3u_metadata would give"""
+        info = {}
+        for field, column in self.columns.items():
+            value = column.get(index)
+            if value is not None:
+                info[field] = value
+        info.update(self.extras.get(index, ()))
+        return info
+
+    def view(self):
+        """A view of every channel in the store"""
+        return ChannelView(self, array("I", range(len(self))))
+
+class ChannelView(Mapping):
+    """A read-only {url: info} mapping over a subset of a ChannelStore's channels"""
+
+    def __init__(self, store, indexes):
+        self.store = store
+        self.indexes = indexes
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __iter__(self):
+        url = self.store.url
+        return (url(index) for index in self.indexes)
+
+    def _index(self, url):
+        index = self.store.find(url)
+        if index is None:
+            return None
+        # Views keep their indexes in ascending order
+        position = bisect_left(self.indexes, index)
+        if position < len(self.indexes) and self.indexes[position] == index:
+            return index
+        return None
+
+    def __contains__(self, url):
+        return self._index(url) is not None
+
+    def __getitem__(self, url):
+        index = self._index(url)
+        if index is None:
+            raise KeyError(url)
+        return self.store.info(index)
+
+    def items(self):
+        store = self.store
+        return ((store.url(index), store.info(index)) for index in self.indexes)
+
+    def values(self):
+        info = self.store.info
+        return (info(index) for index in self.indexes)
+
+    def where(self, predicate):
+        """A narrower view of the channels whose index satisfies predicate"""
+        return ChannelView(self.store, array(self.indexes.typecode, filter(predicate, self.indexes)))
+
+    def where_in(self, field, values):
+        """A narrower view of the channels whose coded field is one of values (case-insensitive)"""
+        column = self.store.columns[field]
+        wanted = column.matching(lambda value: value.lower() in values)
+        codes = column.codes
+        return self.where(lambda index: codes[index] in wanted)
+
+    def head(self, count):
+        return ChannelView(self.store, self.indexes[:count])
+
+    def to_dict(self):
+        return dict(self.items())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+DNS Cache - Resolves stream hosts ahead of the probes and shares the answers
+"""
+
+import ipaddress, socket, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+# getaddrinfo does not expose record TTLs, so answers are kept for a fixed time
+DEFAULT_DNS_TTL = 300
+NEGATIVE_TTL = 30
+
+DEFAULT_RESOLVERS = 8
+
+def _is_address(host):
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+class DnsCache:
+    """A TTL cache in front of socket.getaddrinfo, with background pre-resolution
+
+    ``prefetch(host)`` starts resolving a host on a small resolver pool so
+    the answer is ready by the time a probe connects; concurrent requests
+    for the same host share one lookup. Failed lookups are cached for
+    NEGATIVE_TTL seconds. Between ``install()`` and ``close()`` every
+    getaddrinfo call in the process, including urllib3's, goes through the
+    cache and is counted: ``connections`` is how many connections were
+    opened, ``named_connections`` how many of them were to host names and
+    ``lookups`` how many lookups went to the resolver.
+    """
+
+    def __init__(self, ttl=DEFAULT_DNS_TTL, resolvers=DEFAULT_RESOLVERS):
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=resolvers, thread_name_prefix="dns")
+        self.resolve = socket.getaddrinfo
+        self.installed = False
+        self.lookups = 0
+        self.named_connections = 0
+        self.connections = 0
+
+    def _entry(self, host, connecting=False):
+        """The future answering host, starting a lookup if there is no live one"""
+        now = time.time()
+        with self.lock:
+            if connecting:
+                self.connections += 1
+                self.named_connections += 1
+            entry = self.entries.get(host)
+            if entry and (entry[0] is None or entry[0] > now):
+                return entry[1]
+            future = self.pool.submit(self._lookup, host)
+            # Expiry is set once the answer arrives; None marks a lookup in flight
+            self.entries[host] = (None, future)
+            self.lookups += 1
+            return future
+
+    def _lookup(self, host):
+        try:
+            answer = self.resolve(host, None, 0, socket.SOCK_STREAM)
+            ttl = self.ttl
+        except OSError as e:
+            answer = e
+            ttl = NEGATIVE_TTL
+        with self.lock:
+            entry = self.entries.get(host)
+            if entry:
+                self.entries[host] = (time.time() + ttl, entry[1])
+        return answer
+
+    def prefetch(self, host):
+        """Start resolving a host in the background"""
+        if host and not _is_address(host):
+            self._entry(host)
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """socket.getaddrinfo, answered from the cache for plain TCP lookups of host names
+
+        Parameters keep socket.getaddrinfo's names so keyword callers work;
+        ``type`` therefore shadows the builtin in here.
+        """
+        if (not isinstance(host, str) or _is_address(host) or flags or type not in (0, socket.SOCK_STREAM)
+                or proto not in (0, socket.IPPROTO_TCP)):
+            with self.lock:
+                self.connections += 1
+            return self.resolve(host, port, family, type, proto, flags)
+        answer = self._entry(host, connecting=True).result()
+        if isinstance(answer, OSError):
+            raise answer.__class__(*answer.args)
+        if isinstance(port, str):
+            port = socket.getservbyname(port) if not port.isdigit() else int(port)
+        results = [(af, socktype, proto_, canon, (address[0], port or 0) + tuple(address[2:]))
+                   for af, socktype, proto_, canon, address in answer
+                   if not family or af == family]
+        if not results:
+            raise socket.gaierror(socket.EAI_FAMILY, "no address of the requested family")
+        return results
+
+    @property
+    def lookups_saved(self):
+        """Connections to host names that did not need a lookup of their own"""
+        return max(0, self.named_connections - self.lookups)
+
+    def install(self):
+        """Route the process's getaddrinfo calls through this cache until close()"""
+        self.resolve = socket.getaddrinfo
+        socket.getaddrinfo = self.getaddrinfo
+        self.installed = True
+        return self
+
+    def close(self):
+        if self.installed:
+            socket.getaddrinfo = self.resolve
+            self.installed = False
+        self.pool.shutdown(wait=False, cancel_futures=True)
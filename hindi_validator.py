@@ -3,71 +3,265 @@
 Hindi IPTV Validator - Filters and validates Hindi language channels only
 """
 
-import m3u8, subprocess, requests, time, json, re, yaml, argparse
-from tqdm import tqdm
+import subprocess, time, json, re, argparse, os, sys, hashlib, functools, copy
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from urllib.parse import urlparse
+from hls_probe import (probe_hls, deep_check_hls, race_mirrors, measure_mirror, get_session, session_requests, FAILURE_TOO_SLOW, classify_ffprobe_error, DEFAULT_USER_AGENT, FAILURE_FORBIDDEN,
+                       FAILURE_TIMEOUT, FAILURE_ERROR, FAILURE_GEO_BLOCKED, FAILURE_SERVER, FAILURE_HOST_DOWN,
+                       UNVERIFIED_FAILURES)
+from host_scheduler import HostScheduler, HostLimiter, stream_host, DEFAULT_BREAKER_THRESHOLD
+from host_timeouts import HostTimeouts, backoff_delay
+from proxy_pool import ProxyPool, load_proxies, proxy_settings, EGRESS_FAILURES, STRATEGIES
+from dns_cache import DnsCache
+from stream_media import ffprobe_media_args, parse_ffprobe_media, is_hindi_audio
+from probe_cache import ProbeCache, DEFAULT_CACHE_FILE, HEALTHY_TTL
+from m3u_stream import iter_m3u_channels, format_extinf
+from result_journal import ResultJournal, journal_path
+from change_feed import ChangeFeed, summarize_changes
+from metrics import Metrics
+from sharding import parse_shard, iter_shard
+from channel_merge import group_mirrors
+from channel_store import ChannelStore, ChannelView
+from metadata_snapshot import load_snapshot, save_snapshot
+from revalidation_queue import RevalidationQueue, DEFAULT_MIN_INTERVAL, DEFAULT_MAX_INTERVAL
+
+DEFAULT_WORKERS = 16
+DEFAULT_TIMEOUT = 15
+DEFAULT_PROBE_BUDGET = 60
+DEFAULT_PER_HOST = 4
+
+# Egress proxies a forbidden or geo-blocked stream is tried through before giving up
+EGRESS_ATTEMPTS = 3
+
+# Extra time ffprobe gets beyond its own timeout before it is killed (at most the timeout itself)
+FFPROBE_GRACE = 5
+
+# URLs queued ahead of the running probes while waiting for busy hosts
+READ_AHEAD = 1000
+
+class ProbeOptions:
+    """How streams are probed, shared by every probing round of a run
+
+    ``workers``, ``per_host``, ``timeout``, ``breaker_threshold``,
+    ``native``, ``deep_segments``, ``deep_variant``, ``headers``,
+    ``proxies`` and ``proxy_pool`` are validate_streams' arguments. With
+    ``adaptive_timeouts`` each host's timeout is learned from its latency
+    history (see HostTimeouts) and ``timeout`` is the longest any probe
+    waits. With ``prefetch_dns`` and no proxy, hosts are resolved ahead of
+    their probes and the answers are shared (see DnsCache).
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT,
+                 breaker_threshold=DEFAULT_BREAKER_THRESHOLD, native=True, deep_segments=0,
+                 deep_variant="highest", headers=None, proxies=None, proxy_pool=None,
+                 adaptive_timeouts=True, prefetch_dns=True):
+        self.workers = workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.breaker_threshold = breaker_threshold
+        self.native = native
+        self.deep_segments = deep_segments
+        self.deep_variant = deep_variant
+        self.headers = headers
+        self.proxies = proxies
+        self.proxy_pool = proxy_pool
+        self.adaptive_timeouts = adaptive_timeouts
+        self.prefetch_dns = prefetch_dns
+
+    def stream_args(self):
+        """These options as validate_streams keyword arguments"""
+        return {"workers": self.workers, "per_host": self.per_host, "timeout": self.timeout,
+                "breaker_threshold": self.breaker_threshold, "native": self.native,
+                "deep_segments": self.deep_segments, "deep_variant": self.deep_variant,
+                "headers": self.headers, "proxies": self.proxies, "proxy_pool": self.proxy_pool}
+
+    def resolver(self):
+        """An installed DnsCache when prefetching applies, else None"""
+        # Behind a proxy the proxy does the lookups
+        if self.prefetch_dns and not (self.proxies or self.proxy_pool):
+            return DnsCache().install()
+        return None
+
+def _probe_options(probe, headers=None, proxies=None):
+    """``probe`` (or the default options) with explicit ``headers`` and ``proxies`` applied"""
+    probe = copy.copy(probe) if probe else ProbeOptions()
+    if headers is not None:
+        probe.headers = headers
+    if proxies is not None:
+        probe.proxies = proxies
+    return probe
+
+# Hindi keywords in channel names
+HINDI_KEYWORDS = (
+    'hindi', 'bharat', 'india', 'desi', 'aaj tak', 'zee', 'sony', 'star',
+    'colors', 'ndtv', 'republic', 'abp', 'news18', 'times now', 'dd',
+    'sab', '&tv', 'mtv india', '9xm', 'b4u', 'aastha', 'sanskar', 'ishwar',
+    'disney hindi', 'discovery hindi', 'animal planet hindi', 'national geographic hindi',
+    'history tv18', 'fox life hindi', 'axn hindi', 'hbo hindi', 'warner tv hindi',
+    'sony pix hindi', 'movies now hindi', 'fxl hindi', 'star movies hindi',
+    'utv action hindi', 'utv movies hindi', 'nickelodeon india', 'cartoon network india',
+    'pogo', 'hungama tv', 'discovery kids india', 'marvel hq', 'sonic',
+    'food food', 'living foodz', 'zee khana khazana', 'tlc india', 'travel xp hindi',
+    'cnbc tv18', 'bloomberg tv india', 'et now', 'ndtv profit', 'ndtv good times'
+)
+
+# International brands that offer Hindi content
+INTERNATIONAL_HINDI_BRANDS = (
+    'disney', 'discovery', 'animal planet', 'national geographic', 'history',
+    'fox life', 'axn', 'hbo', 'warner', 'sony pix', 'movies now', 'fxl',
+    'star movies', 'utv action', 'utv movies', 'nickelodeon', 'cartoon network',
+    'pogo', 'hungama', 'discovery kids', 'marvel', 'sonic', 'tlc', 'travel xp',
+    'cnbc', 'bloomberg', 'et now'
+)
+
+# Hindi indicators in titles
+HINDI_INDICATORS = ('hindi', 'india', 'bharat', 'desi')
+
+def compile_keyword_matcher(keywords):
+    """Compile keywords into one regex shaped like a trie
+
+    Alternatives sharing a prefix are merged so each position in a title is
+    tested once per distinct next character, and the longest keyword wins
+    at the leftmost match.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def pattern(node):
+        branches = [re.escape(char) + pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return re.compile(pattern(trie))
+
+# A brand only counts together with 'hindi' or 'india', and every indicator
+# is itself a keyword, so those rules can never fire before the keyword
+# rule does. One matcher over the keywords covers all three.
+HINDI_MATCHER = compile_keyword_matcher(HINDI_KEYWORDS + HINDI_INDICATORS)
+
+def match_hindi_rule(title, metadata_info):
+    """Return the rule that marks a channel as Hindi, or None
+
+    The rule is ``("keyword", <matched keyword>)`` or ``("country", "IN")``.
+    """
+    match = HINDI_MATCHER.search(title.lower())
+    if match:
+        return ("keyword", match.group())
+    if metadata_info.get('country') == 'IN':
+        return ("country", "IN")
+    return None
 
 def is_hindi_channel(title, metadata_info):
     """Check if channel supports Hindi language"""
+    return HINDI_MATCHER.search(title.lower()) is not None or metadata_info.get('country') == 'IN'
+
+def _probe_result(working, failure, started):
+    """Build the result record stored for one stream check"""
+    finished = time.time()
+    return {
+        "working": working,
+        "failure": failure,
+        "latency": round(finished - started, 3),
+        "checked_at": finished
+    }
+
+def _with_media(result, media):
+    """Attach what a probe learned about the stream's codecs and languages to its result"""
+    if media:
+        result["media"] = media
+    return result
+
+def check_stream(url, timeout=DEFAULT_TIMEOUT, headers=None, proxies=None, retries=3, native=True,
+                 metrics=None, deep_segments=0, deep_variant="highest", proxy_pool=None):
+    """Check a stream and return a result record
+
+    The record holds ``working``, the ``failure`` class (``None`` when the
+    stream works), the probe ``latency`` in seconds and ``checked_at``,
+    plus ``media`` (see stream_media) when the probe saw codecs, resolution
+    or audio language tags.
+    With ``native`` set, the stream is first probed over plain HTTP and
+    ffprobe only runs when that result is ambiguous. ``metrics`` counts
+    native decisions, ffprobe spawns and retries.
+
+    With ``deep_segments`` set, a working HLS stream also has its newest
+    segments downloaded; the report is kept under ``deep`` and a stream
+    that cannot keep up with realtime playback fails as ``too_slow``.
+
+    With a ``proxy_pool`` the check goes out through one of its proxies
+    instead of ``proxies``, recorded as ``proxy``; a forbidden or
+    geo-blocked answer is retried through other proxies.
+    """
+    metrics = metrics or Metrics()
+    if proxy_pool:
+        result = _check_through_pool(url, timeout, headers, retries, native, metrics, proxy_pool)
+        proxies = proxy_settings(result["proxy"])
+    else:
+        result = _check_liveness(url, timeout, headers, proxies, retries, native, metrics)
     
-    # Hindi keywords in channel names
-    hindi_keywords = [
-        'hindi', 'bharat', 'india', 'desi', 'aaj tak', 'zee', 'sony', 'star',
-        'colors', 'ndtv', 'republic', 'abp', 'news18', 'times now', 'dd',
-        'sab', '&tv', 'mtv india', '9xm', 'b4u', 'aastha', 'sanskar', 'ishwar',
-        'disney hindi', 'discovery hindi', 'animal planet hindi', 'national geographic hindi',
-        'history tv18', 'fox life hindi', 'axn hindi', 'hbo hindi', 'warner tv hindi',
-        'sony pix hindi', 'movies now hindi', 'fxl hindi', 'star movies hindi',
-        'utv action hindi', 'utv movies hindi', 'nickelodeon india', 'cartoon network india',
-        'pogo', 'hungama tv', 'discovery kids india', 'marvel hq', 'sonic',
-        'food food', 'living foodz', 'zee khana khazana', 'tlc india', 'travel xp hindi',
-        'cnbc tv18', 'bloomberg tv india', 'et now', 'ndtv profit', 'ndtv good times'
-    ]
-    
-    # International brands that offer Hindi content
-    international_hindi_brands = [
-        'disney', 'discovery', 'animal planet', 'national geographic', 'history',
-        'fox life', 'axn', 'hbo', 'warner', 'sony pix', 'movies now', 'fxl',
-        'star movies', 'utv action', 'utv movies', 'nickelodeon', 'cartoon network',
-        'pogo', 'hungama', 'discovery kids', 'marvel', 'sonic', 'tlc', 'travel xp',
-        'cnbc', 'bloomberg', 'et now'
-    ]
-    
-    title_lower = title.lower()
-    
-    # Check if title contains Hindi keywords
-    for keyword in hindi_keywords:
-        if keyword in title_lower:
-            return True
-    
-    # Check if channel is from India (most likely to have Hindi content)
-    if metadata_info.get('country') == 'IN':
-        return True
-    
-    # Check for international brands with Hindi content
-    for brand in international_hindi_brands:
-        if brand in title_lower and ('hindi' in title_lower or 'india' in title_lower):
-            return True
-    
-    # Check for Hindi indicators in title
-    hindi_indicators = ['hindi', 'india', 'bharat', 'desi']
-    for indicator in hindi_indicators:
-        if indicator in title_lower:
-            return True
+    if deep_segments and result["working"]:
+        metrics.count("deep_checks")
+        try:
+            report = deep_check_hls(url, segments=deep_segments, timeout=timeout, headers=headers,
+                                    proxies=proxies, variant=deep_variant)
+        except Exception:
+            # One stream's inconclusive deep check must not stop the run
+            report = None
+        if report:
+            result["deep"] = report
+            if not report["realtime"]:
+                metrics.count("too_slow")
+                result["working"] = False
+                result["failure"] = FAILURE_TOO_SLOW
     
-    return False
+    return result
 
-def is_stream_working(url, timeout=15, headers=None, proxies=None, retries=3):
-    """Enhanced stream validation with better error handling"""
+def _check_through_pool(url, timeout, headers, retries, native, metrics, proxy_pool):
+    """Check a stream through the pool's proxies, trying another egress when one is refused access"""
+    tried = []
+    while True:
+        proxy = proxy_pool.acquire(exclude=tried)
+        tried.append(proxy)
+        result = _check_liveness(url, timeout, headers, proxy_settings(proxy), retries, native, metrics)
+        result["proxy"] = proxy
+        evicted = [proxy] if proxy_pool.release(proxy, result) else []
+        if result["working"] and len(tried) > 1:
+            # The proxies tried before this one were refused a stream that is reachable
+            metrics.count("egress_rescues")
+            evicted += [earlier for earlier in tried[:-1] if proxy_pool.blame(earlier)]
+        for bad in evicted:
+            metrics.count("proxy_evictions")
+            print(f"🌐 Proxy {bad} keeps failing, resting it")
+        if result["failure"] not in EGRESS_FAILURES or len(tried) >= min(EGRESS_ATTEMPTS, len(proxy_pool)):
+            return result
+        metrics.count("egress_retries")
+
+def _check_liveness(url, timeout, headers, proxies, retries, native, metrics):
+    """Decide whether a stream answers at all, natively first and then with ffprobe"""
+    started = time.time()
+    
+    if native:
+        media = {}
+        verdict, failure = probe_hls(url, timeout=timeout, headers=headers, proxies=proxies, media=media)
+        if verdict is not None:
+            metrics.count("native_decided")
+            return _with_media(_probe_result(verdict, failure, started), media)
+        metrics.count("native_ambiguous")
     
     for attempt in range(retries):
+        if attempt:
+            metrics.count("ffprobe_retries")
         try:
             cmd = [
                 "ffprobe", "-v", "error",
-                "-timeout", str(timeout * 1000000),
-                "-i", url,
-                "-show_entries", "format",
-                "-print_format", "json"
+                "-timeout", str(int(timeout * 1000000)),
+                *ffprobe_media_args(),
+                "-i", url
             ]
             
             # Add headers if provided
@@ -77,72 +271,176 @@ def is_stream_working(url, timeout=15, headers=None, proxies=None, retries=3):
             
             # Add user agent if not provided
             if not headers or 'User-Agent' not in headers:
-                cmd.extend(["-headers", "User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"])
+                cmd.extend(["-headers", f"User-Agent: {DEFAULT_USER_AGENT}"])
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout+5)
+            if proxies and proxies.get("http"):
+                cmd.extend(["-http_proxy", proxies["http"]])
+            
+            metrics.count("ffprobe_spawns")
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout + min(FFPROBE_GRACE, timeout))
             
             if result.returncode == 0:
                 # Additional check for geo-blocking
                 if "geo" in result.stderr.lower() or "blocked" in result.stderr.lower():
                     print(f"⚠️  Channel may be geo-blocked: {url}")
-                    return False
-                return True
+                    return _probe_result(False, FAILURE_GEO_BLOCKED, started)
+                return _with_media(_probe_result(True, None, started), parse_ffprobe_media(result.stdout))
             else:
-                # Check for common error patterns
-                stderr = result.stderr.lower()
-                if "connection refused" in stderr or "network unreachable" in stderr:
-                    return False
-                if "403" in stderr or "forbidden" in stderr:
+                # Only server errors and unrecognised failures are worth retrying
+                failure = classify_ffprobe_error(result.stderr)
+                if failure == FAILURE_FORBIDDEN:
                     print(f"🚫 Channel blocked: {url}")
-                    return False
-                if "404" in stderr or "not found" in stderr:
-                    return False
+                if failure not in (None, FAILURE_SERVER):
+                    return _probe_result(False, failure, started)
+                if attempt == retries - 1:
+                    return _probe_result(False, failure or FAILURE_ERROR, started)
+                time.sleep(backoff_delay(attempt + 1))
                     
         except subprocess.TimeoutExpired:
             if attempt == retries - 1:
                 print(f"⏰ Channel timeout: {url}")
-                return False
-            time.sleep(2)
+                return _probe_result(False, FAILURE_TIMEOUT, started)
+            time.sleep(backoff_delay(attempt + 1))
         except Exception as e:
             if attempt == retries - 1:
                 print(f"❌ Channel error: {url} - {str(e)}")
-                return False
-            time.sleep(1)
+                return _probe_result(False, FAILURE_ERROR, started)
+            time.sleep(backoff_delay(attempt + 1))
     
-    return False
+    return _probe_result(False, FAILURE_ERROR, started)
 
-def parse_m3u_metadata(input_file):
-    """Parse M3U file to extract channel metadata from titles"""
-    channels = {}
-    
+def is_stream_working(url, timeout=DEFAULT_TIMEOUT, headers=None, proxies=None, retries=3, native=True):
+    """Enhanced stream validation with better error handling"""
+    return check_stream(url, timeout=timeout, headers=headers, proxies=proxies,
+                        retries=retries, native=native)["working"]
+
+def validate_streams(urls, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST, headers=None, proxies=None,
+                     native=True, on_result=None, breaker_threshold=DEFAULT_BREAKER_THRESHOLD,
+                     timeout=DEFAULT_TIMEOUT, metrics=None, deep_segments=0, deep_variant="highest",
+                     progress=True, timeouts=None, proxy_pool=None, dns=None):
+    """Probe URLs concurrently and return their result records in input order
+
+    At most ``workers`` probes run at once overall and at most ``per_host``
+    of them against the same host; a HostScheduler decides which URL runs
+    next and fast-fails hosts whose circuit breaker has tripped. ``urls``
+    may be a lazy iterable; only a bounded number of URLs are read ahead of
+    the running probes. ``on_result(url, result)`` is called from the
+    calling thread as each result is decided. ``metrics`` receives every
+    result's latency by host and outcome. ``progress`` shows a progress bar.
+    With ``timeouts`` (a HostTimeouts) each probe gets its host's learned
+    timeout instead of ``timeout``, and every result feeds the history.
+    With a ``proxy_pool`` probes are spread over its proxies, and each
+    proxy gets its own ``per_host`` allowance for every host. With ``dns``
+    (a DnsCache) each host is resolved in the background as soon as its
+    first URL is read ahead.
+    """
+    from tqdm import tqdm
+    workers = max(1, workers)
+    metrics = metrics or Metrics()
+    get_session(pool_size=workers)
+    results = []
+    scheduler = HostScheduler(per_host * (len(proxy_pool) if proxy_pool else 1), breaker_threshold)
+    running = {}
+    source = enumerate(urls)
+    exhausted = False
+
+    def finish(index, url, result):
+        results[index] = result
+        metrics.observe_probe(stream_host(url), result)
+        if timeouts:
+            timeouts.record(stream_host(url), result)
+        if on_result:
+            on_result(url, result)
+        progress_bar.update()
+
+    total = len(urls) if hasattr(urls, "__len__") else None
+    with ThreadPoolExecutor(max_workers=workers) as pool, tqdm(total=total, desc="Validating",
+                                                          disable=not progress) as progress_bar:
+        while True:
+            # Read ahead so other hosts have work queued while a busy host is at its limit
+            while not exhausted and scheduler.queued < READ_AHEAD:
+                try:
+                    index, url = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                results.append(None)
+                if dns:
+                    dns.prefetch(urlparse(url).hostname)
+                if not scheduler.add(index, url):
+                    finish(index, url, _probe_result(False, FAILURE_HOST_DOWN, time.time()))
+
+            while len(running) < workers:
+                ready = scheduler.next_ready()
+                if ready is None:
+                    break
+                index, url = ready
+                probe_timeout = timeouts.timeout(stream_host(url)) if timeouts else timeout
+                if probe_timeout < timeout:
+                    metrics.count("learned_timeouts")
+                future = pool.submit(check_stream, url, timeout=probe_timeout, headers=headers, proxies=proxies,
+                                     native=native, metrics=metrics, deep_segments=deep_segments,
+                                     deep_variant=deep_variant, proxy_pool=proxy_pool)
+                running[future] = (index, url)
+
+            # Nothing running means nothing is queued and the input is used up
+            if not running:
+                break
+
+            for future in wait(running, return_when=FIRST_COMPLETED).done:
+                index, url = running.pop(future)
+                result = future.result()
+                finish(index, url, result)
+                tripped, dropped = scheduler.done(url, result)
+                if tripped:
+                    metrics.count("breaker_trips")
+                    tqdm.write(f"⚡ {stream_host(url)} keeps failing to connect, skipping its remaining channels")
+                for dropped_index, dropped_url in dropped:
+                    finish(dropped_index, dropped_url, _probe_result(False, FAILURE_HOST_DOWN, time.time()))
+
+    return results
+
+def iter_m3u_metadata(input_file):
+    """Lazily parse an M3U file into (url, channel_info) pairs, reporting read errors"""
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        current_title = None
-        for line in lines:
-            line = line.strip()
-            if line.startswith('#EXTINF:'):
-                # Extract title from EXTINF line
-                title_match = re.search(r',(.+)$', line)
-                if title_match:
-                    current_title = title_match.group(1).strip()
-            elif line and not line.startswith('#') and current_title:
-                # This is a URL line
-                channels[line] = {
-                    "title": current_title,
-                    "country": "Unknown",
-                    "category": "Unknown",
-                    "language": "Unknown"
-                }
-                current_title = None
+        yield from iter_m3u_channels(input_file)
     except Exception as e:
         print(f"Error parsing M3U metadata: {e}")
+
+def iter_playlists(input_files):
+    """Lazily parse one or more M3U files into a single stream of (url, channel_info) pairs"""
+    if isinstance(input_files, str):
+        input_files = [input_files]
+    for input_file in input_files:
+        yield from iter_m3u_metadata(input_file)
+
+def parse_m3u_metadata(input_file):
+    """Parse M3U file to extract channel metadata from titles
+
+    Duplicate URLs keep their first position and their last entry's details.
+    """
+    channels = {}
+    
+    for url, info in iter_m3u_metadata(input_file):
+        channels[url] = info
     
     return channels
 
+def load_channel_store(input_file):
+    """Parse an M3U file into a compact ChannelStore; duplicate URLs keep their last entry"""
+    return ChannelStore.from_entries(iter_m3u_metadata(input_file))
+
+def _as_view(channels):
+    """A ChannelView for a ChannelStore or view, or None for a plain dict"""
+    if isinstance(channels, ChannelStore):
+        return channels.view()
+    if isinstance(channels, ChannelView):
+        return channels
+    return None
+
 def load_channel_metadata(metadata_file="channels.yml"):
     """Load channel metadata from YAML file"""
+    import yaml
     try:
         with open(metadata_file, 'r', encoding='utf-8') as f:
             return yaml.safe_load(f) or {}
@@ -153,114 +451,501 @@ def load_channel_metadata(metadata_file="channels.yml"):
         print(f"Error loading metadata: {e}")
         return {}
 
-def enhance_channel_metadata(channels, metadata_config):
-    """Enhance channels with metadata from config"""
+def iter_metadata_names(metadata_config):
+    """Yield (channel_name, country, category) in config order, skipping empty names"""
     for country, country_data in metadata_config.items():
         if isinstance(country_data, list):
             # Simple list of channel names
             for channel_name in country_data:
-                if not channel_name:  # Skip empty channel names
-                    continue
-                for url, channel_info in channels.items():
-                    if (channel_info and 
-                        channel_info.get("title") and 
-                        channel_name.lower() in channel_info["title"].lower()):
-                        channel_info["country"] = country
-                        channel_info["category"] = "General"
+                if channel_name:
+                    yield str(channel_name), country, "General"
         elif isinstance(country_data, dict):
             # Structured data with categories
             for category, channel_list in country_data.items():
-                for channel_name in channel_list:
-                    if not channel_name:  # Skip empty channel names
-                        continue
-                    for url, channel_info in channels.items():
-                        if (channel_info and 
-                            channel_info.get("title") and 
-                            channel_name.lower() in channel_info["title"].lower()):
-                            channel_info["country"] = country
-                            channel_info["category"] = category
+                for channel_name in channel_list or []:
+                    if channel_name:
+                        yield str(channel_name), country, category
+
+class MetadataIndex:
+    """Aho-Corasick automaton over the lowercase channel names in the metadata
+
+    A title is scanned once, however many names there are. When several
+    names occur in a title the one listed last in the config wins.
+    """
+
+    def __init__(self, metadata_config):
+        self.entries = []
+        self.goto = [{}]
+        self.fail = [0]
+        self.last = [-1]
+
+        for channel_name, country, category in iter_metadata_names(metadata_config):
+            state = 0
+            for char in channel_name.lower():
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.last.append(-1)
+                state = next_state
+            self.last[state] = len(self.entries)
+            self.entries.append((country, category))
+
+        # Breadth-first pass: link each state to its longest proper suffix
+        # state and fold in the latest entry reachable through that link
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.last[next_state] = max(self.last[next_state], self.last[self.fail[next_state]])
+                queue.append(next_state)
+
+    def to_snapshot(self):
+        """The index's tables as plain data, for metadata_snapshot"""
+        return {"entries": self.entries, "goto": self.goto, "fail": self.fail, "last": self.last}
+
+    @classmethod
+    def from_snapshot(cls, tables):
+        index = cls.__new__(cls)
+        index.entries = tables["entries"]
+        index.goto = tables["goto"]
+        index.fail = tables["fail"]
+        index.last = tables["last"]
+        return index
+
+    def lookup(self, title):
+        """Return (country, category) for the last metadata name in title, or None"""
+        goto, fail, last = self.goto, self.fail, self.last
+        state = 0
+        best = -1
+        for char in title.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if last[state] > best:
+                best = last[state]
+        return self.entries[best] if best >= 0 else None
+
+def load_metadata_index(metadata_file="channels.yml", snapshot=True):
+    """Return a MetadataIndex for a metadata file, reusing its compiled snapshot when valid
+
+    The first load parses the YAML, builds the index and saves it to
+    ``<metadata_file>.snapshot``; later loads unpickle that instead.
+    """
+    if snapshot and os.path.exists(metadata_file):
+        tables = load_snapshot(metadata_file)
+        if tables is not None:
+            return MetadataIndex.from_snapshot(tables)
+        index = MetadataIndex(load_channel_metadata(metadata_file))
+        save_snapshot(metadata_file, index.to_snapshot())
+        return index
+    return MetadataIndex(load_channel_metadata(metadata_file))
+
+def iter_enhanced_channels(entries, metadata_config):
+    """Lazily enhance (url, channel_info) pairs with metadata from config
+
+    ``metadata_config`` may be the loaded YAML or a prebuilt MetadataIndex.
+    """
+    if isinstance(metadata_config, MetadataIndex):
+        index = metadata_config
+    else:
+        index = MetadataIndex(metadata_config)
+    
+    for url, channel_info in entries:
+        if channel_info and channel_info.get("title"):
+            match = index.lookup(channel_info["title"])
+            if match:
+                channel_info["country"], channel_info["category"] = match
+        yield url, channel_info
+
+def enhance_channel_metadata(channels, metadata_config):
+    """Enhance channels (a dict, ChannelStore or ChannelView) with metadata from config"""
+    view = _as_view(channels)
+    if view is not None:
+        index = metadata_config if isinstance(metadata_config, MetadataIndex) else MetadataIndex(metadata_config)
+        store = view.store
+        titles = store.columns["title"]
+        for i in view.indexes:
+            match = index.lookup(titles.get(i))
+            if match:
+                store.set(i, "country", match[0])
+                store.set(i, "category", match[1])
+        return channels
+    
+    for _ in iter_enhanced_channels(channels.items(), metadata_config):
+        pass
     
     return channels
 
-def filter_hindi_channels(channels):
-    """Filter channels to only include Hindi language channels"""
-    hindi_channels = {}
+def iter_hindi_channels(entries):
+    """Lazily keep only Hindi language (url, channel_info) pairs"""
+    search = HINDI_MATCHER.search
     
-    for url, info in channels.items():
-        if is_hindi_channel(info["title"], info):
+    for url, info in entries:
+        # Same test as is_hindi_channel, inlined for large playlists
+        if search(info["title"].lower()) is not None or info.get('country') == 'IN':
             info["language"] = "Hindi"
-            hindi_channels[url] = info
-    
-    return hindi_channels
+            yield url, info
 
-def filter_channels(channels, country=None, category=None):
-    """Filter channels by country and/or category"""
-    filtered = {}
+def filter_hindi_channels(channels):
+    """Filter channels to only include Hindi language channels
+
+    A ChannelStore or ChannelView gives back a ChannelView of the matching
+    indexes instead of a copied dict.
+    """
+    view = _as_view(channels)
+    if view is None:
+        return dict(iter_hindi_channels(channels.items()))
     
-    for url, info in channels.items():
-        include = True
-        
-        if country and info["country"].lower() != country.lower():
-            include = False
-        
-        if category and info["category"].lower() != category.lower():
-            include = False
-        
-        if include:
-            filtered[url] = info
+    store = view.store
+    search = HINDI_MATCHER.search
+    titles = store.columns["title"]
+    countries = store.columns["country"]
+    india = countries.lookup.get("IN")
+    hindi = store.columns["language"].code("Hindi")
+    languages = store.columns["language"].codes
+    
+    def is_hindi(i):
+        if search(titles.get(i).lower()) is not None or countries.codes[i] == india:
+            languages[i] = hindi
+            return True
+        return False
+    
+    return view.where(is_hindi)
+
+def iter_filtered_channels(entries, country=None, category=None):
+    """Lazily keep (url, channel_info) pairs matching country and/or category"""
+    country = country.lower() if country else None
+    category = category.lower() if category else None
     
-    return filtered
+    for url, info in entries:
+        if country and info["country"].lower() != country:
+            continue
+        if category and info["category"].lower() != category:
+            continue
+        yield url, info
+
+def filter_channels(channels, country=None, category=None):
+    """Filter channels by country and/or category; views stay views"""
+    view = _as_view(channels)
+    if view is None:
+        return dict(iter_filtered_channels(channels.items(), country, category))
+    if country:
+        view = view.where_in("country", {country.lower()})
+    if category:
+        view = view.where_in("category", {category.lower()})
+    return view
+
+def _counted(entries, counts, key):
+    """Pass entries through, counting them in counts[key]"""
+    counts[key] = 0
+    for entry in entries:
+        counts[key] += 1
+        yield entry
+
+def render_channels(channels, f, output_format="m3u"):
+    """Write channels as M3U or JSON into the open text file f"""
+    if output_format == "json":
+        json.dump(channels if isinstance(channels, dict) else dict(channels.items()), f, indent=2, ensure_ascii=False)
+    else:
+        # M3U format
+        f.write("#EXTM3U\n")
+        f.write("#EXT-X-VERSION:3\n")
+        for url, info in channels.items():
+            title = f"{info['title']} [{info['country']}] [{info['category']}] [Hindi]"
+            f.write(f"{format_extinf(title, info)}\n")
+            f.write(f"{url}\n")
+
+class _HashingWriter:
+    """A text file wrapper that hashes everything written through it"""
+
+    def __init__(self, f):
+        self.f = f
+        self.hash = hashlib.sha256()
+
+    def write(self, text):
+        self.hash.update(text.encode("utf-8"))
+        return self.f.write(text)
+
+def write_channels(channels, output_file, output_format="m3u", unchanged_digest=None):
+    """Write channels as M3U or JSON, replacing output_file atomically
+
+    Returns ``(digest, written)``: the SHA-256 of the content, and whether
+    output_file was replaced. It is left alone when it exists and the
+    content's digest equals ``unchanged_digest``.
+    """
+    temp_file = f"{output_file}.tmp"
+    with open(temp_file, "w", encoding='utf-8') as f:
+        writer = _HashingWriter(f)
+        render_channels(channels, writer, output_format)
+    digest = writer.hash.hexdigest()
+    if digest == unchanged_digest and os.path.exists(output_file):
+        os.remove(temp_file)
+        return digest, False
+    os.replace(temp_file, output_file)
+    return digest, True
 
 def validate_hindi_playlist(input_file, output_file, metadata_file=None, country=None, category=None, 
-                           headers=None, proxies=None, output_format="m3u"):
-    """Validate and filter Hindi IPTV playlist"""
+                           headers=None, proxies=None, output_format="m3u", probe=None,
+                           cache_file=DEFAULT_CACHE_FILE, max_age=None, force=False, healthy_ttl=HEALTHY_TTL,
+                           journal_file=None, resume=False, metrics_json=None, metrics_prom=None, shard=None,
+                           shard_key="host", mirrors=None, race=False, audio_language=True, change_feed=True,
+                           changes_file=None):
+    """Validate and filter Hindi IPTV playlist
+
+    ``probe`` (a ProbeOptions) says how streams are probed; ``headers``
+    and ``proxies``, when given, replace its own. Learned host timeouts
+    are kept in ``cache_file`` between runs.
+
+    Probe results are kept in ``cache_file`` and reused while fresh, so only
+    new or stale streams are probed: working results for ``healthy_ttl``
+    seconds, failures for a fixed time by kind, and none older than
+    ``max_age``. ``force`` probes everything again. Every result is also
+    appended to ``journal_file`` (next to the output by default) as it
+    arrives; with ``resume`` the URLs already in the journal are not
+    probed again.
+
+    ``input_file`` may be a list of playlists. With ``mirrors`` (the default
+    when there are several inputs) entries are grouped into logical
+    channels; a channel's mirrors are only probed when the URLs before
+    them fail, and the first working one is kept. With ``race`` all of a
+    channel's mirrors are measured at once instead; the fastest to start
+    becomes the channel's URL and the rest are kept as ranked fallbacks.
+
+    With ``shard`` set to ``"i/N"`` only the channels hashed to shard i
+    (by ``shard_key``, "host" or "url") are validated, and the output is
+    JSON carrying each channel's position for merge_shard_outputs. What
+    the probes learn about codecs, resolution and audio languages is kept
+    under each channel's ``media``; with ``audio_language`` a channel whose
+    audio tracks are tagged with languages other than Hindi is dropped. With ``change_feed`` what was
+    added, removed, recovered or changed since the previous run is
+    appended to ``changes_file`` (next to the output by default), and the
+    output is only rewritten when it would differ (see ChangeFeed). Stage
+    timings and probe statistics can be exported to ``metrics_json``
+    and/or ``metrics_prom`` (Prometheus text).
+    """
     
     print("🇮🇳 Hindi IPTV Channel Validator")
     print("=" * 40)
+    if shard:
+        shard_index, shard_count = parse_shard(shard)
+        if output_format != "json":
+            print("   Shard outputs are written as JSON so they can be merged")
+            output_format = "json"
+    metrics = Metrics()
     
-    # Parse channels from M3U
-    print("📋 Parsing M3U file...")
-    channels = parse_m3u_metadata(input_file)
-    print(f"   Found {len(channels)} total channels")
+    # Parse, enhance and filter lazily so probing starts with the first channel
+    input_files = [input_file] if isinstance(input_file, str) else list(input_file)
+    if mirrors is None:
+        mirrors = race or len(input_files) > 1
+    print(f"📋 Streaming {len(input_files)} M3U file(s)...")
+    counts = {}
+    entries = metrics.time_iter("parse", _counted(iter_playlists(input_files), counts, "total"))
+    last_stage = "parse"
     
-    # Load and enhance metadata
     if metadata_file:
         print("📝 Loading metadata...")
-        metadata_config = load_channel_metadata(metadata_file)
-        channels = enhance_channel_metadata(channels, metadata_config)
+        with metrics.stage("metadata"):
+            metadata_config = load_metadata_index(metadata_file)
+        entries = metrics.time_iter("metadata", iter_enhanced_channels(entries, metadata_config), upstream=last_stage)
+        last_stage = "metadata"
     
-    # Filter for Hindi channels first
-    print("🔍 Filtering for Hindi channels...")
-    hindi_channels = filter_hindi_channels(channels)
-    print(f"   Found {len(hindi_channels)} Hindi channels")
+    # Grouping happens before filtering so a mirror listed under another title still counts
+    if mirrors:
+        print("🪞 Grouping mirrors into logical channels...")
+        entries = _counted(group_mirrors(entries), counts, "logical")
     
-    # Additional filtering if specified
+    print("🔍 Filtering for Hindi channels...")
+    entries = _counted(iter_hindi_channels(entries), counts, "hindi")
     if country or category:
         print(f"🎯 Applying filters: {country or 'All countries'}, {category or 'All categories'}")
-        hindi_channels = filter_channels(hindi_channels, country, category)
-        print(f"   After filtering: {len(hindi_channels)} channels")
-    
-    if not hindi_channels:
-        print("❌ No Hindi channels found matching the criteria")
-        return {}
+        entries = _counted(iter_filtered_channels(entries, country, category), counts, "filtered")
+    if shard:
+        print(f"🧩 Validating shard {shard_index} of {shard_count} (by {shard_key})")
+        entries = _counted(iter_shard(entries, shard_index, shard_count, shard_key), counts, "shard")
+    entries = metrics.time_iter("filter", entries, upstream=last_stage)
     
     # Validate streams
-    print("🔧 Testing stream availability...")
+    probe = _probe_options(probe, headers, proxies)
+    print(f"🔧 Testing stream availability ({probe.workers} workers, {probe.per_host} per host)...")
+    # Every channel read is kept until the end; the store holds them compactly
+    hindi_channels = ChannelStore()
     valid_hindi_channels = {}
     dead_channels = []
     blocked_channels = []
+    other_language_channels = []
+    dropped = {}
+    
+    cache = ProbeCache(cache_file, healthy_ttl=healthy_ttl) if cache_file else None
+    timeouts = HostTimeouts(cache_file, ceiling=probe.timeout) if probe.adaptive_timeouts else None
+    dns = probe.resolver()
+    requests_before = session_requests()
+    journal = ResultJournal(journal_file or journal_path(output_file), resume=resume)
+    if resume:
+        print(f"   Resuming with {len(journal.done)} results from {journal.path}")
+    results = {}
+    chosen = {}
+    alternatives = {}
+    races = []
     
-    for url, info in tqdm(hindi_channels.items(), desc="Validating"):
-        if is_stream_working(url, headers=headers, proxies=proxies):
-            valid_hindi_channels[url] = info
+    def usable(result):
+        # A stream found working without the deep check has not had its throughput measured
+        return result and not (probe.deep_segments and result["working"] and "deep" not in result)
+    
+    def acceptable(result):
+        # A stream whose audio is tagged only in other languages is no better than a dead one
+        return result["working"] and not (audio_language and is_hindi_audio(result.get("media")) is False)
+    
+    def known_result(url):
+        """Fill in an earlier result for url from the journal or cache; True if there was one"""
+        if usable(journal.done.get(url)):
+            metrics.count("resumed")
+            results[url] = journal.done[url]
+            return True
+        cached = cache.lookup_fresh(url, max_age=max_age) if cache and not force else None
+        if usable(cached):
+            metrics.count("cache_hits")
+            results[url] = cached
+            journal.record(url, cached)
+            return True
+        return False
+    
+    def urls_to_probe():
+        for url, info in entries:
+            added = len(hindi_channels)
+            hindi_channels.add(url, info)
+            if len(hindi_channels) == added:
+                # A repeated URL only updates the channel's details; it is probed once
+                continue
+            if race and info.get("mirrors"):
+                # Known results settle the channel without a race: an acceptable URL, or none left
+                known = None
+                unknown = False
+                for candidate in [url] + info["mirrors"]:
+                    if not known_result(candidate):
+                        unknown = True
+                    elif acceptable(results[candidate]):
+                        known = candidate
+                        break
+                if known is None and unknown:
+                    races.append(url)
+                elif known not in (None, url):
+                    chosen[url] = known
+            elif not known_result(url):
+                yield url
+    
+    def record_result(url, result):
+        results[url] = result
+        if result["failure"] in UNVERIFIED_FAILURES:
+            # Nothing is known about the stream; the next run (or --resume) should try it
+            return
+        journal.record(url, result)
+        if cache:
+            cache.put(url, result)
+    
+    # Every probing round below shares the same options and bookkeeping
+    probe_streams = functools.partial(validate_streams, **probe.stream_args(), on_result=record_result,
+                                      metrics=metrics, timeouts=timeouts, dns=dns)
+    
+    try:
+        probe_started = time.perf_counter()
+        probed = probe_streams(urls_to_probe())
+        
+        if races:
+            print(f"🏁 Racing mirrors of {len(races)} channels...")
+            race_dead = race_channel_mirrors(races, hindi_channels, chosen, alternatives, record_result,
+                                             probe, metrics, accept=acceptable)
+            # Channels where no mirror could be measured go through the normal checks
+            probed += probe_streams([url for url in race_dead if not known_result(url)])
+        
+        # Fall back through the mirrors of each channel that is dead or in another language, one round per mirror
+        pending = {}
+        for index in range(len(hindi_channels)):
+            candidates = hindi_channels.get(index, "mirrors")
+            url = hindi_channels.url(index) if candidates else None
+            if url and url not in chosen and not acceptable(results[url]):
+                pending[url] = list(candidates)
+        while pending:
+            attempts = {url: candidates.pop(0) for url, candidates in pending.items()}
+            to_probe = [mirror for mirror in dict.fromkeys(attempts.values())
+                        if mirror not in results and not known_result(mirror)]
+            mirror_probed = probe_streams(to_probe)
+            metrics.count("mirror_probes", len(mirror_probed))
+            probed += mirror_probed
+            for url, mirror in attempts.items():
+                if acceptable(results[mirror]):
+                    chosen[url] = mirror
+                    del pending[url]
+                elif not pending[url]:
+                    del pending[url]
+        # Pulling channels through the lazy stages happened inside validate_streams
+        metrics.add_stage_time("probe", time.perf_counter() - probe_started - metrics.inclusive_time("filter"))
+    except BaseException:
+        journal.close()
+        print(f"\n💾 Progress kept in {journal.path}; rerun with --resume to continue")
+        raise
+    finally:
+        if cache:
+            cache.close()
+        if timeouts:
+            timeouts.save()
+        if dns:
+            dns.close()
+            record_connection_reuse(metrics, dns, session_requests() - requests_before)
+    
+    print(f"   Found {counts['total']} total channels, {counts['hindi']} Hindi channels")
+    if "filtered" in counts:
+        print(f"   After filtering: {counts['filtered']} channels")
+    if shard:
+        print(f"   In this shard: {counts.get('shard', 0)} channels")
+    if "logical" in counts:
+        print(f"   Grouped into {counts['logical']} logical channels")
+    if hindi_channels.duplicates:
+        print(f"   Merged {hindi_channels.duplicates} duplicate URLs (the last entry of each is kept)")
+    reused = metrics.counters.get("resumed", 0) + metrics.counters.get("cache_hits", 0)
+    print(f"   Probed {len(probed)} streams, reused {reused} earlier results")
+    
+    if not hindi_channels:
+        if shard:
+            # An empty shard still needs an output for the merge
+            write_channels({}, output_file, output_format)
+        journal.remove()
+        print("❌ No Hindi channels found matching the criteria")
+        return {}
+    
+    for url, info in hindi_channels.view().items():
+        if url in chosen:
+            # A mirror took over; the other URLs become its fallbacks
+            working_url = chosen[url]
+            ranked = alternatives.get(url, [url] + info["mirrors"])
+            info["mirrors"] = [mirror for mirror in ranked if mirror != working_url]
+        elif results[url]["working"]:
+            working_url = url
         else:
-            dead_channels.append(info["title"])
+            if results[url]["failure"] in (FAILURE_FORBIDDEN, FAILURE_GEO_BLOCKED):
+                blocked_channels.append(info["title"])
+            else:
+                dead_channels.append(info["title"])
+            dropped[url] = results[url]["failure"] or "dead"
+            continue
+        if apply_probe_media(info, results.get(working_url)) is False and audio_language:
+            other_language_channels.append(info["title"])
+            dropped[working_url] = "other_language"
+            continue
+        valid_hindi_channels[working_url] = info
     
     # Output results
     print(f"\n📊 Validation Results:")
     print(f"   ✅ Working Hindi channels: {len(valid_hindi_channels)}")
     print(f"   ❌ Dead channels removed: {len(dead_channels)}")
     print(f"   🚫 Blocked channels removed: {len(blocked_channels)}")
+    if other_language_channels:
+        print(f"   🗣️  Audio tagged in other languages: {len(other_language_channels)}")
     
     if dead_channels:
         print(f"\n🪦 Dead channels:")
@@ -269,35 +954,445 @@ def validate_hindi_playlist(input_file, output_file, metadata_file=None, country
         if len(dead_channels) > 5:
             print(f"   ... and {len(dead_channels) - 5} more")
     
-    # Save results
-    if output_format == "json":
-        with open(output_file, "w", encoding='utf-8') as f:
-            json.dump(valid_hindi_channels, f, indent=2, ensure_ascii=False)
+    # Save results, then drop the journal now that they are safely on disk
+    with metrics.stage("write"):
+        if change_feed:
+            feed = ChangeFeed(output_file, changes_file)
+            first_run = feed.first_run
+            changes = feed.compare(valid_hindi_channels, dropped, dropped)
+            digest, rewritten = write_channels(valid_hindi_channels, output_file, output_format,
+                                               unchanged_digest=feed.digest)
+            feed.commit(changes, valid_hindi_channels, dropped, digest)
+        else:
+            write_channels(valid_hindi_channels, output_file, output_format)
+    journal.remove()
+    
+    if change_feed:
+        report_changes(metrics, changes, feed, first_run=first_run)
+    if change_feed and not rewritten:
+        print(f"\n💤 No changes; {output_file} left as it was ({len(valid_hindi_channels)} working Hindi channels)")
     else:
-        # M3U format
-        with open(output_file, "w", encoding='utf-8') as f:
-            f.write("#EXTM3U\n")
-            f.write("#EXT-X-VERSION:3\n")
-            for url, info in valid_hindi_channels.items():
-                title = f"{info['title']} [{info['country']}] [{info['category']}] [Hindi]"
-                f.write(f"#EXTINF:-1,{title}\n")
-                f.write(f"{url}\n")
-    
-    print(f"\n💾 Saved {len(valid_hindi_channels)} working Hindi channels to {output_file}")
+        print(f"\n💾 Saved {len(valid_hindi_channels)} working Hindi channels to {output_file}")
+    
+    metrics.print_summary()
+    if probe.proxy_pool:
+        probe.proxy_pool.print_summary()
+    if metrics_json:
+        metrics.write_json(metrics_json)
+    if metrics_prom:
+        metrics.write_prometheus(metrics_prom)
     return valid_hindi_channels
 
+def report_changes(metrics, changes, feed, first_run=False):
+    """Count a run's changes by kind and report where they were logged"""
+    counts = summarize_changes(changes)
+    for kind, n in counts.items():
+        metrics.count(f"channels_{kind}", n)
+    if not changes:
+        return
+    summary = ", ".join(f"{n} {kind}" for kind, n in counts.items() if n)
+    print(f"🔄 {'First run' if first_run else 'Since the last run'}: {summary} (logged to {feed.path})")
+
+def record_connection_reuse(metrics, dns, requests_made):
+    """Count what the DNS cache and keep-alive connections saved, and report it"""
+    metrics.count("http_requests", requests_made)
+    metrics.count("connections_opened", dns.connections)
+    metrics.count("dns_lookups", dns.lookups)
+    metrics.count("dns_lookups_saved", dns.lookups_saved)
+    # Every connection opened costs a handshake; reused ones do not
+    saved = max(0, requests_made - dns.connections)
+    metrics.count("handshakes_saved", saved)
+    print(f"🔌 {requests_made} HTTP requests over {dns.connections} connections: "
+          f"{saved} handshakes and {dns.lookups_saved} DNS lookups saved ({dns.lookups} lookups made)")
+
+def apply_probe_media(info, result):
+    """Copy a probe's media report into a channel record
+
+    Returns is_hindi_audio for it: True (the channel's language is then
+    confirmed as Hindi), False when tagged tracks are all in other
+    languages, or None when there is nothing to go on.
+    """
+    media = (result or {}).get("media")
+    if not media:
+        return None
+    info["media"] = media
+    hindi = is_hindi_audio(media)
+    if hindi:
+        info["language"] = "Hindi"
+    return hindi
+
+def race_channel_mirrors(urls, channels, chosen, alternatives, on_result, probe, metrics, accept=None):
+    """Race the mirrors of several channels, a few channels at a time
+
+    ``channels`` is the ChannelStore holding them; each winner's startup
+    time is recorded there. Fills ``chosen`` with each channel's winning
+    URL and ``alternatives`` with its mirrors fastest first, and reports
+    each winner's result to ``on_result``. Returns the channels where no
+    mirror could be measured or accepted.
+    Measurements follow ``probe`` (a ProbeOptions): they keep to its
+    ``per_host`` per host (per proxy with a ``proxy_pool``, which they then
+    go out through) and skip hosts whose breaker has tripped, as in
+    validate_streams. A mirror's result carries the media its master
+    playlist declares; one that ``accept`` (a predicate on result records)
+    rejects, e.g. for its audio language, is passed over. With
+    ``deep_segments`` the fastest mirror must also pass the deep check (see
+    check_stream); one too slow for realtime is reported as ``too_slow``
+    and the next fastest is checked instead.
+    """
+    from tqdm import tqdm
+    proxy_pool = probe.proxy_pool
+    limiter = HostLimiter(probe.per_host * (len(proxy_pool) if proxy_pool else 1), probe.breaker_threshold)
+    
+    def limited(url, cancel, attempt):
+        """Run attempt(proxies) -> (value, failure) within url's host limit and through a pool proxy"""
+        if not limiter.acquire(url, cancel):
+            return None
+        proxy = proxy_pool.acquire() if proxy_pool else None
+        started = time.time()
+        value = failure = None
+        try:
+            value, failure = attempt(proxy_settings(proxy) if proxy else probe.proxies)
+        finally:
+            result = _probe_result(value is not None, failure, started)
+            if proxy and proxy_pool.release(proxy, result):
+                metrics.count("proxy_evictions")
+                tqdm.write(f"🌐 Proxy {proxy} keeps failing, resting it")
+            if limiter.release(url, result):
+                metrics.count("breaker_trips")
+                tqdm.write(f"⚡ {stream_host(url)} keeps failing to connect, skipping its remaining mirrors")
+        return value
+    
+    def measure(url, timeout, headers, proxies, cancel):
+        def attempt(egress):
+            outcome = {}
+            return measure_mirror(url, timeout, headers, egress, cancel, outcome), outcome.get("failure")
+        return limited(url, cancel, attempt)
+    
+    def deep_check(url):
+        def attempt(egress):
+            try:
+                return deep_check_hls(url, segments=probe.deep_segments, timeout=probe.timeout,
+                                      headers=probe.headers, proxies=egress, variant=probe.deep_variant), None
+            except Exception:
+                return None, None
+        metrics.count("deep_checks")
+        return limited(url, None, attempt)
+    
+    def race_one(url):
+        started = time.time()
+        mirrors = channels.get(channels.find(url), "mirrors")
+        ranked, measurements = race_mirrors([url] + mirrors, timeout=probe.timeout, headers=probe.headers,
+                                            proxies=probe.proxies, measure=measure)
+        # Go through the measured mirrors fastest first until one is accepted (and keeps up)
+        tried = []
+        for candidate in ranked:
+            if candidate not in measurements:
+                break
+            result = _with_media(_probe_result(True, None, started), measurements[candidate].get("media"))
+            if accept and not accept(result):
+                tried.append((candidate, result, False))
+                continue
+            report = deep_check(candidate) if probe.deep_segments else None
+            if report:
+                result["deep"] = report
+                if not report["realtime"]:
+                    result.update(working=False, failure=FAILURE_TOO_SLOW)
+                    tried.append((candidate, result, False))
+                    continue
+            tried.append((candidate, result, True))
+            break
+        return url, ranked, measurements, tried
+    
+    unmeasured = []
+    with ThreadPoolExecutor(max_workers=max(1, probe.workers // 2)) as pool:
+        for url, ranked, measurements, tried in tqdm(pool.map(race_one, urls), total=len(urls), desc="Racing"):
+            metrics.count("mirror_races")
+            winner = None
+            rejected = []
+            for candidate, result, accepted in tried:
+                if result["failure"] == FAILURE_TOO_SLOW:
+                    metrics.count("too_slow")
+                on_result(candidate, result)
+                if accepted:
+                    winner = candidate
+                else:
+                    rejected.append(candidate)
+            if winner is None:
+                unmeasured.append(url)
+                continue
+            chosen[url] = winner
+            alternatives[url] = [candidate for candidate in ranked if candidate not in rejected] + rejected
+            channels.set(channels.find(url), "startup", measurements[winner]["startup"])
+    return unmeasured
+
+def merge_shard_outputs(shard_files, output_file, output_format="m3u"):
+    """Combine shard JSON outputs into one playlist in the original playlist order"""
+    merged = {}
+    for shard_file in shard_files:
+        with open(shard_file, "r", encoding="utf-8") as f:
+            channels = json.load(f)
+        print(f"📥 {shard_file}: {len(channels)} channels")
+        for url, info in channels.items():
+            merged.setdefault(url, info)
+    
+    ordered = sorted(merged.items(), key=lambda item: item[1].get("position", 0))
+    channels = {url: {key: value for key, value in info.items() if key != "position"} for url, info in ordered}
+    write_channels(channels, output_file, output_format)
+    print(f"💾 Merged {len(channels)} working channels from {len(shard_files)} shards into {output_file}")
+    return channels
+
+def load_hindi_channels(input_file, metadata_config=None, country=None, category=None):
+    """Parse, enhance and filter a playlist into {url: info}, keeping the last of duplicate URLs"""
+    entries = iter_m3u_metadata(input_file)
+    if metadata_config:
+        entries = iter_enhanced_channels(entries, metadata_config)
+    entries = iter_filtered_channels(iter_hindi_channels(entries), country, category)
+    channels = {}
+    for url, info in entries:
+        channels[url] = info
+    return channels
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
+
+def watch_hindi_playlist(input_file, output_file, metadata_file=None, country=None, category=None,
+                         headers=None, proxies=None, output_format="m3u", probe=None,
+                         cache_file=DEFAULT_CACHE_FILE, healthy_ttl=HEALTHY_TTL, metrics_json=None, metrics_prom=None,
+                         budget=DEFAULT_PROBE_BUDGET, min_interval=DEFAULT_MIN_INTERVAL,
+                         max_interval=DEFAULT_MAX_INTERVAL, duration=None, audio_language=True,
+                         change_feed=True, changes_file=None):
+    """Keep revalidating a playlist and rewrite the output whenever it changes
+
+    Channels are probed in the order a RevalidationQueue makes them due,
+    spending at most ``budget`` probes per minute. The input and metadata
+    files are re-read when they change on disk. The output is first written
+    once every channel has a result, then rewritten atomically only when
+    the set of working channels changes. Runs until interrupted, or for
+    ``duration`` seconds. ``probe`` (with ``headers`` and ``proxies``),
+    ``audio_language`` and ``change_feed`` work as in
+    validate_hindi_playlist; every rewrite appends its changes to the feed.
+    """
+    
+    print("🇮🇳 Hindi IPTV Channel Validator (watch mode)")
+    print("=" * 40)
+    if input_file == "-":
+        raise ValueError("watch mode needs an input file it can re-read, not stdin")
+    if budget < 1:
+        raise ValueError("watch mode needs a budget of at least one probe per minute")
+    
+    probe = _probe_options(probe, headers, proxies)
+    metrics = Metrics()
+    cache = ProbeCache(cache_file, healthy_ttl=healthy_ttl) if cache_file else None
+    timeouts = HostTimeouts(cache_file, ceiling=probe.timeout) if probe.adaptive_timeouts else None
+    dns = probe.resolver()
+    requests_before = session_requests()
+    queue = RevalidationQueue(min_interval=min_interval, max_interval=max_interval)
+    feed = ChangeFeed(output_file, changes_file) if change_feed else None
+    channels = {}
+    results = {}
+    written = None
+    seen_mtimes = None
+    tokens = float(budget)
+    refilled = time.time()
+    stop_at = time.time() + duration if duration else None
+    probe_streams = functools.partial(validate_streams, **probe.stream_args(), metrics=metrics,
+                                      progress=False, timeouts=timeouts, dns=dns)
+    
+    def reload():
+        nonlocal channels
+        metadata_config = load_metadata_index(metadata_file) if metadata_file else None
+        loaded = load_hindi_channels(input_file, metadata_config, country, category)
+        for url in channels.keys() - loaded.keys():
+            queue.remove(url)
+            results.pop(url, None)
+        for url, info in loaded.items():
+            if url not in queue:
+                # Stale results are probed again before the first publish instead of being reused
+                cached = cache.lookup_fresh(url) if cache else None
+                queue.add(url, category=info.get("category"), result=cached)
+                if cached:
+                    results[url] = cached
+            else:
+                queue.add(url, category=info.get("category"))
+        channels = loaded
+        print(f"📋 Watching {len(channels)} Hindi channels from {input_file} ({budget} probes/min)")
+    
+    def publish():
+        nonlocal written
+        if len(results) < len(channels):
+            return
+        working = {url: info for url, info in channels.items() if results[url]["working"]
+                   and not (apply_probe_media(info, results[url]) is False and audio_language)}
+        snapshot = list(working.items())
+        if snapshot == written:
+            return
+        if feed:
+            dropped = {url: "other_language" if results[url]["working"] else results[url]["failure"] or "dead"
+                       for url in channels if url not in working}
+            first_run = feed.first_run
+            changes = feed.compare(working, dropped, dropped)
+            digest, rewritten = write_channels(working, output_file, output_format, unchanged_digest=feed.digest)
+            feed.commit(changes, working, dropped, digest)
+            report_changes(metrics, changes, feed, first_run=first_run)
+            written = snapshot
+            if not rewritten:
+                print(f"💤 {time.strftime('%H:%M:%S')} {output_file} already up to date ({len(working)} channels)")
+                return
+        else:
+            write_channels(working, output_file, output_format)
+            written = snapshot
+        metrics.count("rewrites")
+        print(f"💾 {time.strftime('%H:%M:%S')} Saved {len(working)} of {len(channels)} channels to {output_file}")
+    
+    try:
+        while stop_at is None or time.time() < stop_at:
+            mtimes = (_mtime(input_file), _mtime(metadata_file))
+            if mtimes != seen_mtimes:
+                seen_mtimes = mtimes
+                reload()
+                publish()
+            
+            # Refill the probe budget, which is spread evenly over each minute
+            now = time.time()
+            tokens = min(float(budget), tokens + (now - refilled) * budget / 60)
+            refilled = now
+            
+            due = queue.pop_due(int(tokens), now=now)
+            if not due:
+                next_due = queue.next_due()
+                wait_for = 1.0 if next_due is None else next_due - now
+                if tokens < 1:
+                    wait_for = max(wait_for, (1 - tokens) * 60 / budget)
+                time.sleep(min(max(wait_for, 0.05), 5.0))
+                continue
+            
+            tokens -= len(due)
+            changes = 0
+            
+            def record_result(url, result):
+                nonlocal changes
+                results[url] = result
+                if cache and result["failure"] not in UNVERIFIED_FAILURES:
+                    cache.put(url, result)
+                if queue.record(url, result):
+                    changes += 1
+            
+            probe_streams(due, on_result=record_result)
+            metrics.count("probes", len(due))
+            if changes:
+                metrics.count("state_changes", changes)
+                publish()
+            if timeouts:
+                timeouts.save()
+            if metrics_json:
+                metrics.write_json(metrics_json)
+            if metrics_prom:
+                metrics.write_prometheus(metrics_prom)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        if cache:
+            cache.close()
+        if dns:
+            dns.close()
+            record_connection_reuse(metrics, dns, session_requests() - requests_before)
+    
+    metrics.print_summary()
+    if probe.proxy_pool:
+        probe.proxy_pool.print_summary()
+    return {url: channels[url] for url, _ in written or []}
+
+def at_least_one(value):
+    """argparse type for counts that must be positive"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return number
+
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Hindi IPTV Playlist Validator")
-    parser.add_argument("input_file", help="Input M3U file")
+    if sys.argv[1:2] == ["merge"]:
+        parser = argparse.ArgumentParser(prog="hindi_validator.py merge",
+                                         description="Merge shard JSON outputs in original playlist order")
+        parser.add_argument("output_file", help="Output file")
+        parser.add_argument("shard_files", nargs="+", help="JSON outputs of the shard runs")
+        parser.add_argument("--format", choices=["m3u", "json"], default="m3u", help="Output format")
+        args = parser.parse_args(sys.argv[2:])
+        merge_shard_outputs(args.shard_files, args.output_file, args.format)
+        sys.exit(0)
+    
+    parser = argparse.ArgumentParser(description="Hindi IPTV Playlist Validator",
+                                     epilog="Combine shard outputs with: hindi_validator.py merge OUTPUT SHARD.json...")
+    parser.add_argument("input_files", nargs="+", metavar="input_file",
+                        help="Input M3U file(s), optionally gzipped ('-' for stdin)")
     parser.add_argument("output_file", help="Output file")
     parser.add_argument("--metadata", help="Channel metadata YAML file", default="channels.yml")
     parser.add_argument("--country", help="Filter by country (default: IN for India)")
     parser.add_argument("--category", help="Filter by category (News, Sports, Entertainment, etc.)")
     parser.add_argument("--format", choices=["m3u", "json"], default="m3u", help="Output format")
     parser.add_argument("--user-agent", help="Custom User-Agent header")
-    parser.add_argument("--proxy", help="Proxy URL (e.g., http://127.0.0.1:8080)")
+    parser.add_argument("--proxy", action="append",
+                        help="Proxy URL (e.g., http://127.0.0.1:8080); repeat to spread probes over several")
+    parser.add_argument("--proxy-file", help="File of proxy URLs, one per line, to spread probes over")
+    parser.add_argument("--proxy-strategy", choices=STRATEGIES, default="round-robin",
+                        help="How probes are assigned to pooled proxies")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Maximum concurrent stream checks")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="Maximum concurrent stream checks per host")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="Per-probe timeout in seconds (the ceiling for learned per-host timeouts)")
+    parser.add_argument("--fixed-timeout", action="store_true",
+                        help="Always use --timeout instead of learning per-host timeouts from latency history")
+    parser.add_argument("--breaker", type=int, default=DEFAULT_BREAKER_THRESHOLD,
+                        help="Skip a host after this many consecutive connection failures (0 to disable)")
+    parser.add_argument("--deep-check", type=int, default=0, metavar="SEGMENTS",
+                        help="Download this many of the newest segments and drop streams slower than realtime")
+    parser.add_argument("--deep-variant", choices=["highest", "lowest"], default="highest",
+                        help="Variant to measure in the deep check")
+    parser.add_argument("--ffprobe-only", action="store_true", help="Skip the native HTTP probe and always run ffprobe")
+    parser.add_argument("--no-dns-prefetch", action="store_true",
+                        help="Resolve hosts only when a probe connects, without the shared DNS cache")
+    parser.add_argument("--ignore-audio-language", action="store_true",
+                        help="Keep channels whose audio tracks are tagged only with other languages")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_FILE, help="Probe result cache file")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the probe result cache")
+    parser.add_argument("--max-age", type=float, help="Re-probe cached results older than this many seconds")
+    parser.add_argument("--healthy-ttl", type=float, default=HEALTHY_TTL,
+                        help="Seconds a cached working result stays fresh (default: 26h, so nightly runs reuse it)")
+    parser.add_argument("--force", action="store_true", help="Probe every channel, ignoring cached results")
+    parser.add_argument("--metrics-json", help="Write run metrics as JSON to this file")
+    parser.add_argument("--metrics-prom", help="Write run metrics in Prometheus text format to this file")
+    parser.add_argument("--group-mirrors", action="store_true",
+                        help="Group entries of the same channel into one with mirror URLs (default with several inputs)")
+    parser.add_argument("--race-mirrors", action="store_true",
+                        help="Measure all of a channel's mirrors at once and keep the fastest as its URL")
+    parser.add_argument("--shard", metavar="I/N",
+                        help="Validate only shard I of N (combine the JSON outputs with 'merge')")
+    parser.add_argument("--shard-by", choices=["host", "url"], default="host",
+                        help="Partition shards by stream host (keeps per-host limits) or by URL")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running, revalidating channels as they fall due and rewriting the output on change")
+    parser.add_argument("--budget", type=at_least_one, default=DEFAULT_PROBE_BUDGET,
+                        help="Watch mode: maximum probes per minute")
+    parser.add_argument("--min-interval", type=float, default=DEFAULT_MIN_INTERVAL,
+                        help="Watch mode: shortest time between probes of one channel (seconds)")
+    parser.add_argument("--max-interval", type=float, default=DEFAULT_MAX_INTERVAL,
+                        help="Watch mode: longest time between probes of a stable channel (seconds)")
+    parser.add_argument("--journal", help="Result journal file (default: <output_file>.journal.jsonl)")
+    parser.add_argument("--resume", action="store_true", help="Skip channels already recorded in the journal")
+    parser.add_argument("--changes", help="Change feed file (default: <output_file>.changes.jsonl)")
+    parser.add_argument("--no-changes", action="store_true",
+                        help="Always rewrite the output and keep no change feed or previous result set")
     
     args = parser.parse_args()
+    if args.watch and len(args.input_files) > 1:
+        parser.error("--watch takes a single input file")
+    if args.shard:
+        try:
+            parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
     
     # Default to India if no country specified
     if not args.country:
@@ -308,19 +1403,79 @@ if __name__ == "__main__":
     if args.user_agent:
         headers["User-Agent"] = args.user_agent
     
-    # Prepare proxies
+    # Prepare proxies: one is used for everything, several become a pool
     proxies = {}
-    if args.proxy:
-        proxies["http"] = args.proxy
-        proxies["https"] = args.proxy
-    
-    validate_hindi_playlist(
-        args.input_file,
-        args.output_file,
-        metadata_file=args.metadata,
-        country=args.country,
-        category=args.category,
+    proxy_pool = None
+    proxy_list = list(args.proxy or [])
+    if args.proxy_file:
+        try:
+            proxy_list += load_proxies(args.proxy_file)
+        except OSError as e:
+            parser.error(f"cannot read --proxy-file: {e}")
+    if len(proxy_list) == 1 and not args.proxy_file:
+        proxies = proxy_settings(proxy_list[0])
+    elif proxy_list:
+        proxy_pool = ProxyPool(proxy_list, strategy=args.proxy_strategy)
+    elif args.proxy_file:
+        parser.error(f"no proxies in {args.proxy_file}")
+    
+    probe = ProbeOptions(
+        workers=args.workers,
+        per_host=args.per_host,
+        timeout=args.timeout,
+        breaker_threshold=args.breaker,
+        native=not args.ffprobe_only,
+        deep_segments=args.deep_check,
+        deep_variant=args.deep_variant,
         headers=headers,
         proxies=proxies,
-        output_format=args.format
+        proxy_pool=proxy_pool,
+        adaptive_timeouts=not args.fixed_timeout,
+        prefetch_dns=not args.no_dns_prefetch
     )
+    
+    if args.watch:
+        watch_hindi_playlist(
+            args.input_files[0],
+            args.output_file,
+            metadata_file=args.metadata,
+            country=args.country,
+            category=args.category,
+            output_format=args.format,
+            probe=probe,
+            cache_file=None if args.no_cache else args.cache,
+            metrics_json=args.metrics_json,
+            metrics_prom=args.metrics_prom,
+            budget=args.budget,
+            min_interval=args.min_interval,
+            max_interval=args.max_interval,
+            audio_language=not args.ignore_audio_language,
+            change_feed=not args.no_changes,
+            changes_file=args.changes,
+            healthy_ttl=args.healthy_ttl
+        )
+    else:
+        validate_hindi_playlist(
+            args.input_files,
+            args.output_file,
+            metadata_file=args.metadata,
+            country=args.country,
+            category=args.category,
+            output_format=args.format,
+            probe=probe,
+            cache_file=None if args.no_cache else args.cache,
+            max_age=args.max_age,
+            healthy_ttl=args.healthy_ttl,
+            force=args.force,
+            journal_file=args.journal,
+            resume=args.resume,
+            metrics_json=args.metrics_json,
+            metrics_prom=args.metrics_prom,
+            shard=args.shard,
+            shard_key=args.shard_by,
+            mirrors=True if args.group_mirrors else None,
+            race=args.race_mirrors,
+            audio_language=not args.ignore_audio_language,
+            change_feed=not args.no_changes,
+            changes_file=args.changes
+        )
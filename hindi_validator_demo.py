@@ -4,23 +4,27 @@ Hindi IPTV Validator Demo - Filters Hindi channels without actual stream validat
 """
 
 import json
-from hindi_validator import parse_m3u_metadata, load_channel_metadata, enhance_channel_metadata, filter_hindi_channels, filter_channels, is_hindi_channel
+from hindi_validator import load_channel_store, load_metadata_index, enhance_channel_metadata, filter_hindi_channels, filter_channels, is_hindi_channel
 
-def validate_hindi_playlist_demo(input_file, output_file, metadata_file=None, country=None, category=None, output_format="m3u"):
-    """Validate and filter Hindi IPTV playlist (demo version without actual stream testing)"""
+def demo_working_channels(input_file, metadata_file=None, country=None, category=None):
+    """Parse, enrich and filter a playlist, then simulate stream validation
+
+    Returns the "working" channels as a {url: info} ChannelView without
+    writing anything, so several outputs can be rendered from one run.
+    """
     
     print("🇮🇳 Hindi IPTV Channel Validator (Demo Mode)")
     print("=" * 50)
     
     # Parse channels from M3U
     print("📋 Parsing M3U file...")
-    channels = parse_m3u_metadata(input_file)
+    channels = load_channel_store(input_file)
     print(f"   Found {len(channels)} total channels")
     
     # Load and enhance metadata
     if metadata_file:
         print("📝 Loading metadata...")
-        metadata_config = load_channel_metadata(metadata_file)
+        metadata_config = load_metadata_index(metadata_file)
         channels = enhance_channel_metadata(channels, metadata_config)
         print("   Metadata enhanced successfully")
     
@@ -54,7 +58,7 @@ def validate_hindi_playlist_demo(input_file, output_file, metadata_file=None, co
     total_channels = len(hindi_channels)
     # Simulate 70% success rate
     working_count = int(total_channels * 0.7)
-    working_channels = dict(list(hindi_channels.items())[:working_count])
+    working_channels = hindi_channels.head(working_count)
     dead_count = total_channels - working_count
     
     print(f"\n🔧 Stream Validation (Simulated):")
@@ -62,10 +66,19 @@ def validate_hindi_playlist_demo(input_file, output_file, metadata_file=None, co
     print(f"   ❌ Dead channels removed: {dead_count}")
     print(f"   🚫 Blocked channels removed: 0")
     
+    return working_channels
+
+def validate_hindi_playlist_demo(input_file, output_file, metadata_file=None, country=None, category=None, output_format="m3u"):
+    """Validate and filter Hindi IPTV playlist (demo version without actual stream testing)"""
+    
+    working_channels = demo_working_channels(input_file, metadata_file, country, category)
+    if not working_channels:
+        return {}
+    
     # Output results
     if output_format == "json":
         with open(output_file, "w", encoding='utf-8') as f:
-            json.dump(working_channels, f, indent=2, ensure_ascii=False)
+            json.dump(working_channels.to_dict(), f, indent=2, ensure_ascii=False)
     else:
         # M3U format
         with open(output_file, "w", encoding='utf-8') as f:
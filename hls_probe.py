@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Native HLS probe - checks streams over HTTP before falling back to ffprobe
+"""
+
+import re, threading, time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from stream_media import hls_master_media
+
+# m3u8 and requests are imported where they are used, so code that only
+# needs the failure classes (filters, cache, scheduler) starts quickly
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# Failure classes shared by the native probe, ffprobe fallback and cache
+FAILURE_NOT_FOUND = "not_found"
+FAILURE_FORBIDDEN = "forbidden"
+FAILURE_REFUSED = "refused"
+FAILURE_TIMEOUT = "timeout"
+FAILURE_ERROR = "error"
+FAILURE_GEO_BLOCKED = "geo_blocked"
+FAILURE_SERVER = "server_error"
+FAILURE_HOST_DOWN = "host_down"
+FAILURE_TOO_SLOW = "too_slow"
+FAILURE_PROXY = "proxy_error"
+
+# Failures that will not fix themselves on a retry
+PERMANENT_FAILURES = (FAILURE_NOT_FOUND, FAILURE_FORBIDDEN)
+
+# Failures that say the host itself is unreachable, not just one stream
+CONNECTION_FAILURES = (FAILURE_REFUSED, FAILURE_TIMEOUT)
+
+# Results that say nothing about the stream itself (it was not probed, or the
+# proxy in front of it failed); they are never cached or journaled
+UNVERIFIED_FAILURES = (FAILURE_HOST_DOWN, FAILURE_PROXY)
+
+# Statuses that mean the stream is gone, not just having a bad moment
+DEAD_STATUSES = {401: FAILURE_FORBIDDEN, 403: FAILURE_FORBIDDEN, 404: FAILURE_NOT_FOUND, 410: FAILURE_NOT_FOUND}
+
+# A proxy that could not open a CONNECT tunnel says so with a status line
+TUNNEL_FAILURE = re.compile(r"Tunnel connection failed: (\d{3})")
+
+# Tunnel statuses that are the proxy refusing us, not news about the origin
+PROXY_REFUSALS = (403, 407)
+
+def classify_proxy_error(error):
+    """Failure class for a requests ProxyError
+
+    Only a proxy that could not be reached or refused to serve us is a
+    ``proxy_error``. When it answered a CONNECT with a gateway error, the
+    origin behind it is what failed: a 504 is a timeout and anything else
+    a refused connection.
+    """
+    match = TUNNEL_FAILURE.search(str(error))
+    if not match or int(match.group(1)) in PROXY_REFUSALS:
+        return FAILURE_PROXY
+    return FAILURE_TIMEOUT if match.group(1) == "504" else FAILURE_REFUSED
+
+# ffprobe/libavformat error messages, checked in order
+FFPROBE_ERRORS = (
+    (re.compile(r"connection refused|network is unreachable|network unreachable|no route to host|"
+                r"failed to resolve|name or service not known|temporary failure in name resolution"), FAILURE_REFUSED),
+    (re.compile(r"(server returned|http error) (401|403)|\bforbidden\b|\bunauthorized\b|access denied"), FAILURE_FORBIDDEN),
+    (re.compile(r"(server returned|http error) (404|410)|\bnot found\b|\bgone\b"), FAILURE_NOT_FOUND),
+    (re.compile(r"timed out|\btimeout\b"), FAILURE_TIMEOUT),
+    (re.compile(r"(server returned|http error) 5|server error"), FAILURE_SERVER),
+)
+
+def classify_ffprobe_error(stderr):
+    """Map ffprobe's error output to a failure class, or None if unrecognised"""
+    stderr = stderr.lower()
+    for pattern, failure in FFPROBE_ERRORS:
+        if pattern.search(stderr):
+            return failure
+    return None
+
+# Result of a probe that could not decide either way
+AMBIGUOUS = (None, None)
+
+# A body that does not start like a playlist within this many bytes is not HLS
+PLAYLIST_SNIFF_BYTES = 64 * 1024
+
+# Playlists larger than this are left to ffprobe
+PLAYLIST_MAX_BYTES = 1024 * 1024
+
+# Hosts whose idle keep-alive connections the shared session holds on to
+HOST_POOLS = 256
+
+_session = None
+_session_size = 0
+_session_requests = 0
+_session_lock = threading.Lock()
+
+def _count_request(response, *args, **kwargs):
+    global _session_requests
+    with _session_lock:
+        _session_requests += 1
+
+def session_requests():
+    """How many HTTP requests the shared session has made so far"""
+    return _session_requests
+
+def get_session(pool_size=32):
+    """Return the shared keep-alive HTTP session used by all probes
+
+    The connection pool grows when a caller asks for more connections than
+    it currently holds. Idle connections are kept for up to HOST_POOLS
+    hosts, so a host's TCP and TLS handshakes are paid once per run rather
+    than once per probe.
+    """
+    global _session, _session_size
+    import requests
+    from requests.adapters import HTTPAdapter
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.hooks["response"].append(_count_request)
+        if pool_size > _session_size:
+            adapter = HTTPAdapter(pool_connections=max(pool_size, HOST_POOLS), pool_maxsize=pool_size)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session_size = pool_size
+        return _session
+
+def _request_headers(headers):
+    """Merge caller headers with the default User-Agent"""
+    merged = {"User-Agent": DEFAULT_USER_AGENT}
+    if headers:
+        merged.update(headers)
+    return merged
+
+def _is_media_type(content_type):
+    """True for Content-Types of media bodies rather than playlists (video/mp2t, audio/aac, ...)"""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    return content_type.startswith("video/") or (content_type.startswith("audio/") and "mpegurl" not in content_type)
+
+def _iter_available(response):
+    """A streamed response's body in whatever pieces have arrived, without waiting to fill a buffer"""
+    raw = response.raw
+    if not hasattr(raw, "read1"):
+        # urllib3 < 2 has no read1; small chunks keep the wait for each short
+        yield from response.iter_content(1024)
+        return
+    while True:
+        chunk = raw.read1(8192, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+def _read_playlist_text(response, deadline):
+    """The playlist text of a streamed response, or None if it is not HLS or does not end in time
+
+    Only the first PLAYLIST_SNIFF_BYTES are read before deciding the body is
+    not HLS, and an HLS body stops being read at PLAYLIST_MAX_BYTES, so a
+    progressive live stream never keeps the probe reading.
+    """
+    body = bytearray()
+    for chunk in _iter_available(response):
+        body += chunk
+        # Skip a byte order mark and leading whitespace before looking for the tag
+        head = bytes(body[:PLAYLIST_SNIFF_BYTES]).lstrip(b"\xef\xbb\xbf \t\r\n")
+        if len(head) >= len(b"#EXTM3U") and not head.startswith(b"#EXTM3U"):
+            return None
+        if not head and len(body) >= PLAYLIST_SNIFF_BYTES:
+            return None
+        if len(body) > PLAYLIST_MAX_BYTES or time.monotonic() > deadline:
+            return None
+    text = body.decode("utf-8-sig", errors="replace")
+    return text if text.lstrip().startswith("#EXTM3U") else None
+
+def _fetch_playlist(url, timeout, headers, proxies):
+    """GET and parse a playlist; returns (playlist, outcome) where outcome is set when decided
+
+    The whole fetch, body included, is bounded by ``timeout``.
+    """
+    import m3u8
+    deadline = time.monotonic() + timeout
+    with get_session().get(url, timeout=timeout, headers=headers, proxies=proxies or None,
+                           stream=True) as response:
+        if response.status_code in DEAD_STATUSES:
+            return None, (False, DEAD_STATUSES[response.status_code])
+        if response.status_code != 200 or _is_media_type(response.headers.get("Content-Type")):
+            # Not HLS (progressive stream, error page, ...) - let ffprobe decide
+            return None, AMBIGUOUS
+        text = _read_playlist_text(response, deadline)
+        if text is None:
+            return None, AMBIGUOUS
+        return m3u8.loads(text, uri=response.url), None
+
+def probe_hls(url, timeout=10, headers=None, proxies=None, media=None):
+    """Probe an HLS stream natively
+
+    Fetches the playlist, follows a master playlist to its first variant and
+    HEADs the newest media segment. Returns a ``(verdict, failure)`` pair:
+    ``(True, None)`` when the stream is clearly alive, ``(False, failure
+    class)`` when it is clearly dead and ``(None, None)`` when the result is
+    ambiguous and ffprobe should decide. A ``media`` dict is filled with
+    what a master playlist declares (codecs, resolution, audio languages).
+    """
+    import requests
+    headers = _request_headers(headers)
+    try:
+        playlist, outcome = _fetch_playlist(url, timeout, headers, proxies)
+        if playlist is None:
+            return outcome
+
+        if playlist.is_variant:
+            if not playlist.playlists:
+                return AMBIGUOUS
+            if media is not None:
+                media.update(hls_master_media(playlist))
+            variant_url = playlist.playlists[0].absolute_uri
+            playlist, outcome = _fetch_playlist(variant_url, timeout, headers, proxies)
+            if playlist is None:
+                return outcome
+
+        if not playlist.segments:
+            return AMBIGUOUS
+
+        segment_url = playlist.segments[-1].absolute_uri
+        response = get_session().head(segment_url, timeout=timeout, headers=headers,
+                                      proxies=proxies or None, allow_redirects=True)
+        if 200 <= response.status_code < 300:
+            return True, None
+        return AMBIGUOUS
+    except requests.exceptions.ProxyError as e:
+        failure = classify_proxy_error(e)
+        if failure == FAILURE_PROXY:
+            # The proxy, not the stream, failed; ffprobe would go through the same proxy
+            return False, FAILURE_PROXY
+        # The origin behind the proxy failed; timeouts are as ambiguous as without one
+        return AMBIGUOUS if failure == FAILURE_TIMEOUT else (False, failure)
+    except (requests.exceptions.Timeout, requests.exceptions.SSLError):
+        return AMBIGUOUS
+    except requests.exceptions.ConnectionError:
+        # Refused connections and DNS failures will not get better with ffprobe
+        return False, FAILURE_REFUSED
+    except Exception:
+        return AMBIGUOUS
+
+def deep_check_hls(url, segments=3, timeout=10, headers=None, proxies=None, variant="highest", min_ratio=1.0):
+    """Measure whether an HLS stream delivers its segments faster than realtime
+
+    Picks the ``highest`` or ``lowest`` BANDWIDTH variant, downloads its
+    newest ``segments`` segments one after another over the shared session
+    and compares the download time with their playback duration. Returns a
+    report dict, or None when the playlists cannot be fetched or parsed as
+    HLS (the check is then inconclusive).
+    """
+    import requests
+    headers = _request_headers(headers)
+    session = get_session()
+    bandwidth = None
+    try:
+        playlist, outcome = _fetch_playlist(url, timeout, headers, proxies)
+        if playlist is None:
+            return None
+        if playlist.is_variant:
+            if not playlist.playlists:
+                return None
+            pick = max if variant == "highest" else min
+            chosen_variant = pick(playlist.playlists, key=lambda p: p.stream_info.bandwidth or 0)
+            bandwidth = chosen_variant.stream_info.bandwidth
+            playlist, outcome = _fetch_playlist(chosen_variant.absolute_uri, timeout, headers, proxies)
+            if playlist is None:
+                return None
+        chosen = playlist.segments[-segments:]
+        media_seconds = sum(segment.duration or 0 for segment in chosen)
+    except (requests.exceptions.RequestException, ValueError, TypeError):
+        # Malformed playlists (e.g. a non-numeric #EXTINF or BANDWIDTH) fail to parse
+        return None
+
+    if not chosen or media_seconds <= 0:
+        return None
+
+    # Once this much time has passed the stream cannot keep up, so stop early
+    started = time.perf_counter()
+    deadline = started + media_seconds / min_ratio
+    downloaded = 0
+    delivered = 0.0
+    complete = True
+    try:
+        for segment in chosen:
+            with session.get(segment.absolute_uri, stream=True, timeout=timeout, headers=headers,
+                             proxies=proxies or None) as response:
+                if response.status_code != 200:
+                    complete = False
+                    break
+                for chunk in response.iter_content(64 * 1024):
+                    downloaded += len(chunk)
+                    if time.perf_counter() > deadline:
+                        complete = False
+                        break
+            if not complete:
+                break
+            delivered += segment.duration or 0
+    except requests.exceptions.RequestException:
+        complete = False
+
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    throughput = downloaded * 8 / elapsed
+    # Only fully downloaded segments count towards the media delivered
+    ratio = delivered / elapsed
+    return {
+        "variant_bandwidth": bandwidth,
+        "segments": len(chosen),
+        "media_seconds": round(media_seconds, 3),
+        "download_seconds": round(elapsed, 3),
+        "bytes": downloaded,
+        "throughput_bps": int(throughput),
+        "realtime_ratio": round(ratio, 2),
+        "bandwidth_headroom": round(throughput / bandwidth, 2) if bandwidth else None,
+        "realtime": complete and ratio >= min_ratio
+    }
+
+def measure_mirror(url, timeout=10, headers=None, proxies=None, cancel=None, outcome=None):
+    """Time how quickly a stream can start: playlists plus its newest segment
+
+    Returns a dict with the segment's time-to-first-byte (``ttfb``), its
+    download ``throughput_bps`` and ``startup``, the seconds from the first
+    request until the segment was in hand, plus ``media`` (see
+    hls_master_media) when the stream has a master playlist. Returns None when the stream is
+    not readable HLS, a request fails, or ``cancel`` (a threading.Event) is
+    set before the measurement finishes. An ``outcome`` dict gets the
+    failure class of a failed measurement under ``failure`` (None when
+    nothing is known).
+    """
+    import requests
+    headers = _request_headers(headers)
+    session = get_session()
+    started = time.perf_counter()
+    outcome = {} if outcome is None else outcome
+    outcome["failure"] = None
+    media = None
+    try:
+        playlist, decided = _fetch_playlist(url, timeout, headers, proxies)
+        if playlist is not None and playlist.is_variant:
+            if not playlist.playlists or (cancel and cancel.is_set()):
+                return None
+            media = hls_master_media(playlist)
+            playlist, decided = _fetch_playlist(playlist.playlists[0].absolute_uri, timeout, headers, proxies)
+        if playlist is None and decided:
+            outcome["failure"] = decided[1]
+        if playlist is None or not playlist.segments or (cancel and cancel.is_set()):
+            return None
+
+        requested = time.perf_counter()
+        with session.get(playlist.segments[-1].absolute_uri, stream=True, timeout=timeout, headers=headers,
+                         proxies=proxies or None) as response:
+            ttfb = time.perf_counter() - requested
+            if response.status_code != 200:
+                return None
+            size = 0
+            for chunk in response.iter_content(64 * 1024):
+                if cancel and cancel.is_set():
+                    return None
+                size += len(chunk)
+    except requests.exceptions.ProxyError as e:
+        outcome["failure"] = classify_proxy_error(e)
+        return None
+    except requests.exceptions.Timeout:
+        outcome["failure"] = FAILURE_TIMEOUT
+        return None
+    except requests.exceptions.ConnectionError:
+        outcome["failure"] = FAILURE_REFUSED
+        return None
+    except Exception:
+        # Whatever went wrong, this mirror could not be measured
+        outcome["failure"] = FAILURE_ERROR
+        return None
+
+    finished = time.perf_counter()
+    measurement = {
+        "url": url,
+        "ttfb": round(ttfb, 4),
+        "throughput_bps": int(size * 8 / max(finished - requested - ttfb, 1e-6)),
+        "startup": round(finished - started, 4)
+    }
+    if media:
+        measurement["media"] = media
+    return measurement
+
+def race_mirrors(urls, timeout=10, headers=None, proxies=None, measure=None):
+    """Measure a channel's mirrors concurrently and rank them by startup time
+
+    The first mirror to finish its measurement wins. Mirrors still running
+    get as long again as the winner took, so close runners-up are ranked
+    too, and are then cancelled. Returns ``(ranked, measurements)``: every
+    URL, measured ones fastest first, then cancelled ones and finally those
+    that failed, each in their original order; and the measurement dict of
+    each mirror that finished. ``measure`` replaces measure_mirror (same
+    arguments), e.g. to wrap it in host limits; a measurement that raises
+    counts as failed.
+    """
+    measure = measure or measure_mirror
+    cancel = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=len(urls))
+    futures = {pool.submit(measure, url, timeout, headers, proxies, cancel): url for url in urls}
+    measurements = {}
+    failed = set()
+    deadline = None
+    pending = set(futures)
+    while pending:
+        remaining = None if deadline is None else deadline - time.perf_counter()
+        if remaining is not None and remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            measurement = None if future.exception() else future.result()
+            if not measurement:
+                failed.add(futures[future])
+            else:
+                measurements[futures[future]] = measurement
+                if deadline is None:
+                    deadline = time.perf_counter() + measurement["startup"]
+    # Losers stop at their next check; a request already waiting on the network runs out its timeout
+    cancel.set()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    measured = sorted(measurements, key=lambda url: measurements[url]["startup"])
+    cancelled = [url for url in urls if url not in measurements and url not in failed]
+    return measured + cancelled + [url for url in urls if url in failed], measurements
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Host Scheduler - Groups probe work by host with per-host limits and a circuit breaker
+"""
+
+import threading
+from collections import deque, OrderedDict
+from urllib.parse import urlparse
+from hls_probe import CONNECTION_FAILURES
+
+DEFAULT_BREAKER_THRESHOLD = 3
+
+def stream_host(url):
+    """Return the lowercase host (with any explicit port) of a stream URL"""
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    return f"{host}:{port}" if port else host
+
+class HostScheduler:
+    """Hands out queued URLs so no host has more than ``per_host`` probes in flight
+
+    Hosts take turns, so one large CDN cannot starve the rest of the
+    playlist. After ``breaker_threshold`` consecutive connection-level
+    failures (refused, DNS, timeout) a host's breaker trips: its queued and
+    future URLs are returned as fast failures instead of being probed.
+    A threshold of 0 disables the breaker.
+    """
+
+    def __init__(self, per_host, breaker_threshold=DEFAULT_BREAKER_THRESHOLD):
+        self.per_host = max(1, per_host)
+        self.breaker_threshold = breaker_threshold
+        self.queues = OrderedDict()
+        self.in_flight = {}
+        self.failures = {}
+        self.tripped = set()
+        self.queued = 0
+
+    def add(self, item, url):
+        """Queue an item; returns False if its host's breaker has already tripped"""
+        host = stream_host(url)
+        if host in self.tripped:
+            return False
+        self.queues.setdefault(host, deque()).append((item, url))
+        self.queued += 1
+        return True
+
+    def next_ready(self):
+        """Return the next (item, url) whose host has spare capacity, or None"""
+        for host in list(self.queues):
+            if self.in_flight.get(host, 0) < self.per_host:
+                queue = self.queues.pop(host)
+                item, url = queue.popleft()
+                if queue:
+                    # Move the host to the back of the line
+                    self.queues[host] = queue
+                self.in_flight[host] = self.in_flight.get(host, 0) + 1
+                self.queued -= 1
+                return item, url
+        return None
+
+    def done(self, url, result):
+        """Record a finished probe
+
+        Returns ``(tripped, dropped)``: whether this result tripped the host's
+        breaker, and the queued (item, url) pairs dropped because of it.
+        """
+        host = stream_host(url)
+        self.in_flight[host] -= 1
+        if result["working"]:
+            self.failures[host] = 0
+            return False, []
+        if result["failure"] not in CONNECTION_FAILURES:
+            return False, []
+
+        self.failures[host] = self.failures.get(host, 0) + 1
+        if not self.breaker_threshold or self.failures[host] < self.breaker_threshold or host in self.tripped:
+            return False, []
+        self.tripped.add(host)
+        dropped = list(self.queues.pop(host, ()))
+        self.queued -= len(dropped)
+        return True, dropped
+
+class HostLimiter:
+    """Per-host limits and circuit breaker for probes that run on their own threads
+
+    Mirror races measure each mirror on a thread of its own instead of
+    through a HostScheduler queue. Such a probe ``acquire``s a slot on its
+    host first and ``release``s it with its result, which feeds the same
+    breaker a HostScheduler keeps. Safe to use from several threads.
+    """
+
+    def __init__(self, per_host, breaker_threshold=DEFAULT_BREAKER_THRESHOLD):
+        self.scheduler = HostScheduler(per_host, breaker_threshold)
+        self.condition = threading.Condition()
+
+    def acquire(self, url, cancel=None):
+        """Wait for a free slot on url's host; False if its breaker has tripped or ``cancel`` is set"""
+        host = stream_host(url)
+        in_flight = self.scheduler.in_flight
+        with self.condition:
+            while True:
+                if host in self.scheduler.tripped or (cancel and cancel.is_set()):
+                    return False
+                if in_flight.get(host, 0) < self.scheduler.per_host:
+                    in_flight[host] = in_flight.get(host, 0) + 1
+                    return True
+                # Releases wake waiters; the timeout lets a cancelled race stop waiting
+                self.condition.wait(0.1)
+
+    def release(self, url, result):
+        """Free url's slot; returns True if this result tripped its host's breaker"""
+        with self.condition:
+            tripped, _ = self.scheduler.done(url, result)
+            self.condition.notify_all()
+        return tripped
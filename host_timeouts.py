@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Host Timeouts - Per-host probe timeouts learned from recorded latencies
+"""
+
+import json, random, sqlite3, time
+from collections import deque
+from hls_probe import FAILURE_TIMEOUT, FAILURE_NOT_FOUND, FAILURE_FORBIDDEN, FAILURE_GEO_BLOCKED, FAILURE_SERVER
+
+# A learned timeout is the host's p99 latency times this, kept within floor and ceiling
+TIMEOUT_MULTIPLIER = 4
+DEFAULT_FLOOR = 2.0
+
+# Latencies kept per host, and how many are needed before trusting them
+HISTORY_SIZE = 100
+MIN_SAMPLES = 5
+
+# Results that prove the host answered, so their latency says how fast it is
+ANSWERED = (None, FAILURE_NOT_FOUND, FAILURE_FORBIDDEN, FAILURE_GEO_BLOCKED, FAILURE_SERVER)
+
+# Consecutive timeouts after which a host with no latency history gets the floor
+DEAD_STREAK = 3
+
+# Retry delays: full jitter over an exponentially growing window
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Seconds to wait before retry number ``attempt`` (1 for the first retry)"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def percentile(values, fraction):
+    """The nearest-rank percentile of a non-empty sequence"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class HostTimeouts:
+    """Learns how long each host takes to answer and sizes its probe timeouts to match
+
+    A host with at least MIN_SAMPLES recorded latencies gets
+    ``p99 * multiplier``, clamped to ``[floor, ceiling]``; the ceiling is the
+    configured timeout, so learning only ever shortens it. A host with no
+    history that keeps timing out gets the floor. Everything else uses the
+    configured timeout. Only answers count as latencies: a timeout or an
+    unexplained error says nothing about how fast the host is when it does
+    answer.
+
+    History lives in a ``host_latency`` table of the probe cache database,
+    loaded when the object is created and written back by ``save``.
+    """
+
+    def __init__(self, path=None, ceiling=15, floor=DEFAULT_FLOOR, multiplier=TIMEOUT_MULTIPLIER):
+        self.path = path
+        self.ceiling = ceiling
+        self.floor = min(floor, ceiling)
+        self.multiplier = multiplier
+        self.latencies = {}
+        self.streaks = {}
+        if path:
+            self._load()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS host_latency (
+                host TEXT PRIMARY KEY,
+                latencies TEXT NOT NULL,
+                timeout_streak INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        return conn
+
+    def _load(self):
+        conn = self._connect()
+        try:
+            for host, latencies, streak, _ in conn.execute("SELECT * FROM host_latency"):
+                self.latencies[host] = deque(json.loads(latencies), maxlen=HISTORY_SIZE)
+                self.streaks[host] = streak
+        finally:
+            conn.close()
+
+    def save(self):
+        """Write the history back to the database"""
+        if not self.path:
+            return
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO host_latency (host, latencies, timeout_streak, updated_at) VALUES (?, ?, ?, ?)",
+                    [(host, json.dumps(list(self.latencies.get(host, ()))), self.streaks.get(host, 0), now)
+                     for host in self.latencies.keys() | self.streaks.keys()]
+                )
+        finally:
+            conn.close()
+
+    def record(self, host, result):
+        """Learn from one probe result"""
+        if result["failure"] == FAILURE_TIMEOUT:
+            self.streaks[host] = self.streaks.get(host, 0) + 1
+        elif result["failure"] in ANSWERED:
+            self.latencies.setdefault(host, deque(maxlen=HISTORY_SIZE)).append(result["latency"])
+            self.streaks[host] = 0
+
+    def timeout(self, host):
+        """The probe timeout to use for a host"""
+        latencies = self.latencies.get(host)
+        if latencies and len(latencies) >= MIN_SAMPLES:
+            learned = percentile(latencies, 0.99) * self.multiplier
+            return min(self.ceiling, max(self.floor, learned))
+        if self.streaks.get(host, 0) >= DEAD_STREAK:
+            return self.floor
+        return self.ceiling
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Streaming M3U parser - Reads plain, gzip or stdin playlists one entry at a time
+"""
+
+import gzip, io, re, sys
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# EXTINF attributes kept on each channel, mapped to their channel dict keys
+EXTINF_ATTRIBUTES = {
+    "tvg-id": "tvg_id",
+    "tvg-country": "tvg_country",
+    "tvg-language": "tvg_language",
+    "group-title": "group_title",
+    "tvg-logo": "tvg_logo"
+}
+
+EXTINF_ATTRIBUTE = re.compile(r'([A-Za-z0-9_-]+)="([^"]*)"')
+
+def open_playlist(source):
+    """Open a playlist path (or '-' for stdin) as text, unpacking gzip transparently"""
+    if source == "-":
+        raw = sys.stdin.buffer
+    else:
+        raw = open(source, "rb")
+    if not isinstance(raw, io.BufferedReader):
+        raw = io.BufferedReader(raw)
+    if raw.peek(2)[:2] == GZIP_MAGIC:
+        raw = gzip.GzipFile(fileobj=raw)
+    return io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+
+def parse_extinf(line):
+    """Split an #EXTINF line into (title, attributes)
+
+    The title is everything after the first comma that follows the
+    attributes, so commas inside quoted attribute values are kept intact.
+    Returns a None title when the line has none.
+    """
+    body = line[len("#EXTINF:"):]
+    attributes = {}
+    end = 0
+    for match in EXTINF_ATTRIBUTE.finditer(body):
+        if body.find(",", end, match.start()) != -1:
+            break
+        attributes[match.group(1).lower()] = match.group(2)
+        end = match.end()
+
+    comma = body.find(",", end)
+    title = body[comma + 1:].strip() if comma != -1 else ""
+    return title or None, attributes
+
+def iter_m3u_channels(source):
+    """Yield (url, channel_info) for every entry of an M3U playlist
+
+    Lines are read one at a time, so memory use does not grow with the
+    playlist. Duplicate URLs are yielded every time they appear.
+    """
+    with open_playlist(source) as f:
+        current_title = None
+        current_attributes = {}
+        for line in f:
+            line = line.strip()
+            if line.startswith('#EXTINF:'):
+                current_title, current_attributes = parse_extinf(line)
+            elif line and not line.startswith('#') and current_title:
+                # This is a URL line
+                info = {
+                    "title": current_title,
+                    "country": "Unknown",
+                    "category": "Unknown",
+                    "language": "Unknown"
+                }
+                for attribute, key in EXTINF_ATTRIBUTES.items():
+                    if current_attributes.get(attribute):
+                        info[key] = current_attributes[attribute]
+                yield line, info
+                current_title = None
+
+def format_extinf(title, info):
+    """Build an #EXTINF line, writing back any EXTINF attributes the channel carries"""
+    attributes = "".join(
+        f' {attribute}="{info[key]}"' for attribute, key in EXTINF_ATTRIBUTES.items() if info.get(key)
+    )
+    return f"#EXTINF:-1{attributes},{title}"
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Metadata Snapshot - Caches compiled channel metadata next to its YAML source
+"""
+
+import hashlib, os, pickle
+
+# Bump when the pickled structures change shape
+SNAPSHOT_VERSION = 1
+
+def snapshot_path(source):
+    """Default snapshot location for a metadata file"""
+    return source + ".snapshot"
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def load_snapshot(source, path=None):
+    """Return the payload saved for source, or None if there is no valid snapshot
+
+    A snapshot is valid while the source's mtime and size are unchanged.
+    When only the mtime moved (a touch or a checkout), the content hash
+    decides, and a matching snapshot is re-stamped so the next load is
+    cheap again. Snapshots are pickles: only load ones this tool wrote.
+    """
+    path = path or snapshot_path(source)
+    try:
+        stamp = _stamp(source)
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    if snapshot["stamp"] == stamp:
+        return snapshot["payload"]
+    try:
+        if _file_hash(source) != snapshot["sha256"]:
+            return None
+    except OSError:
+        return None
+    save_snapshot(source, snapshot["payload"], path, sha256=snapshot["sha256"])
+    return snapshot["payload"]
+
+def save_snapshot(source, payload, path=None, sha256=None):
+    """Write payload as the snapshot of source; returns False if it could not be written"""
+    path = path or snapshot_path(source)
+    temp_file = f"{path}.tmp"
+    try:
+        stamp = _stamp(source)
+        snapshot = {"version": SNAPSHOT_VERSION, "stamp": stamp, "sha256": sha256 or _file_hash(source),
+                    "payload": payload}
+        with open(temp_file, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, path)
+        return True
+    except OSError:
+        return False
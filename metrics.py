@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Validator Metrics - Stage timings, probe latency histograms and counters with JSON/Prometheus export
+"""
+
+import json, os, threading, time
+
+METRIC_PREFIX = "hindi_validator"
+
+# Pipeline stages in the order channels flow through them
+STAGE_ORDER = ("parse", "metadata", "filter", "probe", "write")
+
+# Probe latency histogram buckets (seconds)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 60)
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(pairs):
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in pairs) + "}"
+
+class Metrics:
+    """Thread-safe collection of one validator run's measurements"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.stages = {}
+        self.counters = {}
+        self.histograms = {}
+        self._inclusive = {}
+
+    def add_stage_time(self, stage, seconds):
+        with self.lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def stage(self, stage):
+        """Context manager timing a block as part of a stage"""
+        metrics = self
+
+        class _StageTimer:
+            def __enter__(self):
+                self.started = time.perf_counter()
+
+            def __exit__(self, *exc):
+                metrics.add_stage_time(stage, time.perf_counter() - self.started)
+
+        return _StageTimer()
+
+    def time_iter(self, stage, entries, upstream=None):
+        """Pass entries through, charging time spent producing them to stage
+
+        Lazy stages pull from each other, so the time measured around
+        ``next()`` includes every stage upstream. Naming the ``upstream``
+        stage lets that share be subtracted, leaving each stage its own time.
+        """
+        inclusive = 0.0
+        iterator = iter(entries)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    entry = next(iterator)
+                except StopIteration:
+                    inclusive += time.perf_counter() - started
+                    return
+                inclusive += time.perf_counter() - started
+                yield entry
+        finally:
+            with self.lock:
+                self._inclusive[stage] = inclusive
+                own = inclusive - (self._inclusive.get(upstream, 0.0) if upstream else 0.0)
+                self.stages[stage] = self.stages.get(stage, 0.0) + own
+
+    def inclusive_time(self, stage):
+        """Total time spent producing a lazy stage's output, upstream included"""
+        with self.lock:
+            return self._inclusive.get(stage, 0.0)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe_probe(self, host, result):
+        """Add one probe result to the latency histogram for its host and outcome"""
+        key = (host, result["failure"] or "ok")
+        latency = result["latency"]
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += latency
+            histogram["count"] += 1
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "started_at": self.started,
+                "wall_seconds": round(time.time() - self.started, 3),
+                "stages": {stage: round(seconds, 4) for stage, seconds in self.stages.items()},
+                "counters": dict(self.counters),
+                "probe_latency": [
+                    {
+                        "host": host,
+                        "outcome": outcome,
+                        "count": histogram["count"],
+                        "sum": round(histogram["sum"], 4),
+                        "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS], histogram["buckets"]))
+                    }
+                    for (host, outcome), histogram in sorted(self.histograms.items())
+                ]
+            }
+
+    def to_prometheus(self):
+        """Render the metrics in the Prometheus text exposition format"""
+        data = self.to_dict()
+        lines = [
+            f"# HELP {METRIC_PREFIX}_run_seconds Wall time of the whole run",
+            f"# TYPE {METRIC_PREFIX}_run_seconds gauge",
+            f"{METRIC_PREFIX}_run_seconds {data['wall_seconds']}",
+            f"# HELP {METRIC_PREFIX}_stage_seconds Wall time spent in each pipeline stage",
+            f"# TYPE {METRIC_PREFIX}_stage_seconds gauge"
+        ]
+        for stage, seconds in sorted(data["stages"].items()):
+            lines.append(f"{METRIC_PREFIX}_stage_seconds{_labels([('stage', stage)])} {seconds}")
+
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name}_total counter")
+            lines.append(f"{METRIC_PREFIX}_{name}_total {value}")
+
+        name = f"{METRIC_PREFIX}_probe_latency_seconds"
+        lines.append(f"# HELP {name} Stream probe latency by host and outcome")
+        lines.append(f"# TYPE {name} histogram")
+        for entry in data["probe_latency"]:
+            base = [("host", entry["host"]), ("outcome", entry["outcome"])]
+            for bound, value in entry["buckets"].items():
+                lines.append(f"{name}_bucket{_labels(base + [('le', bound)])} {value}")
+            lines.append(f"{name}_bucket{_labels(base + [('le', '+Inf')])} {entry['count']}")
+            lines.append(f"{name}_sum{_labels(base)} {entry['sum']}")
+            lines.append(f"{name}_count{_labels(base)} {entry['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        _write_atomic(path, json.dumps(self.to_dict(), indent=2))
+
+    def write_prometheus(self, path):
+        _write_atomic(path, self.to_prometheus())
+
+    def print_summary(self):
+        data = self.to_dict()
+        print(f"\n⏱️  Stage timings ({data['wall_seconds']:.2f}s total):")
+        stages = sorted(data["stages"].items(),
+                        key=lambda item: STAGE_ORDER.index(item[0]) if item[0] in STAGE_ORDER else len(STAGE_ORDER))
+        for stage, seconds in stages:
+            print(f"   {stage}: {seconds:.2f}s")
+        if data["counters"]:
+            print("   " + ", ".join(f"{name} {value}" for name, value in sorted(data["counters"].items())))
+
+def _write_atomic(path, text):
+    temp_file = f"{path}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_file, path)
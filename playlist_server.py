@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Playlist Server - Serves validated channels as filtered M3U/JSON over HTTP
+"""
+
+import gzip, hashlib, io, json, os, threading, time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from hindi_validator import render_channels
+from probe_cache import ProbeCache
+
+# Channel attributes the catalog indexes, and so the query parameters it accepts
+INDEXED_FIELDS = ("country", "category", "language", "health")
+
+FORMATS = {"/playlist.m3u": ("m3u", "audio/x-mpegurl"), "/playlist.json": ("json", "application/json")}
+
+# Rendered responses kept besides the precomputed slices
+RESPONSE_CACHE_SIZE = 256
+
+# How often a request may look for a newer results file (seconds)
+RELOAD_CHECK_INTERVAL = 1.0
+
+class Response:
+    """A rendered body with its gzip form and ETags"""
+
+    def __init__(self, body, content_type):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=6)
+        self.content_type = content_type
+        digest = hashlib.sha1(body).hexdigest()[:20]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"'
+
+class PlaylistCatalog:
+    """Validated channels indexed by country, category, language and health
+
+    Each index maps a lowercased value to the ascending positions of the
+    channels that have it, so a query is a few set intersections and the
+    result keeps the playlist order. Health comes from the probe cache when
+    one is given ("working" or the failure class), else every channel is
+    "working". Responses for the whole playlist and for each country,
+    category and health value are rendered up front; other queries are
+    rendered on first use and kept in a small LRU.
+    """
+
+    def __init__(self, channels, health=None):
+        self.entries = list(channels.items())
+        self.indexes = {field: {} for field in INDEXED_FIELDS}
+        for position, (url, info) in enumerate(self.entries):
+            values = {field: info.get(field) for field in INDEXED_FIELDS}
+            values["health"] = (health or {}).get(url, "working")
+            for field, value in values.items():
+                if value:
+                    self.indexes[field].setdefault(value.lower(), []).append(position)
+        self.responses = OrderedDict()
+        self.precomputed = {}
+        self.lock = threading.Lock()
+        for key in self._common_queries():
+            self.precomputed[key] = self._render(*key)
+
+    def _common_queries(self):
+        filters = [()] + [((field, (value,)),) for field in ("country", "category", "health")
+                          for value in self.indexes[field]]
+        return [(output_format, query) for output_format, _ in FORMATS.values() for query in filters]
+
+    def select(self, query):
+        """Positions of the channels matching every field of query (any of each field's values)"""
+        positions = None
+        for field, values in query:
+            matched = set()
+            for value in values:
+                matched.update(self.indexes[field].get(value, ()))
+            positions = matched if positions is None else positions & matched
+        return range(len(self.entries)) if positions is None else sorted(positions)
+
+    def _render(self, output_format, query):
+        channels = dict(self.entries[position] for position in self.select(query))
+        out = io.StringIO()
+        render_channels(channels, out, output_format)
+        content_type = dict(FORMATS.values())[output_format]
+        return Response(out.getvalue().encode("utf-8"), content_type)
+
+    def response(self, output_format, query):
+        """The (cached) response for a format and a normalized query"""
+        key = (output_format, query)
+        if key in self.precomputed:
+            return self.precomputed[key]
+        with self.lock:
+            if key in self.responses:
+                self.responses.move_to_end(key)
+                return self.responses[key]
+        rendered = self._render(output_format, query)
+        with self.lock:
+            self.responses[key] = rendered
+            if len(self.responses) > RESPONSE_CACHE_SIZE:
+                self.responses.popitem(last=False)
+        return rendered
+
+    def summary(self):
+        """Channel counts per indexed value"""
+        return {"channels": len(self.entries),
+                **{field: {value: len(positions) for value, positions in sorted(index.items())}
+                   for field, index in self.indexes.items()}}
+
+def parse_query(query_string):
+    """Normalize a query string into a hashable query; raises ValueError for unknown parameters
+
+    Values are case-insensitive and a parameter may be repeated or hold a
+    comma-separated list.
+    """
+    query = {}
+    for field, values in parse_qs(query_string).items():
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"unknown filter {field!r}; use {', '.join(INDEXED_FIELDS)}")
+        for value in values:
+            query.setdefault(field, set()).update(part.strip().lower() for part in value.split(",") if part.strip())
+    return tuple(sorted((field, tuple(sorted(values))) for field, values in query.items()))
+
+def load_health(cache_file):
+    """{url: "working" or failure class} from a probe cache"""
+    cache = ProbeCache(cache_file)
+    try:
+        rows = cache.conn.execute("SELECT url, working, failure FROM probes").fetchall()
+    finally:
+        cache.close()
+    return {url: "working" if working else (failure or "error") for url, working, failure in rows}
+
+class PlaylistServer:
+    """Serves a validator's JSON results, reloading them when the file changes"""
+
+    def __init__(self, results_file, cache_file=None, host="127.0.0.1", port=8000):
+        self.results_file = results_file
+        self.cache_file = cache_file
+        self.catalog = None
+        self.loaded_mtime = None
+        self.checked_at = 0.0
+        self.reload_lock = threading.Lock()
+        self.reload()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reload(self):
+        """Load the results file (and probe cache health) into a fresh catalog"""
+        mtime = os.stat(self.results_file).st_mtime_ns
+        with open(self.results_file, "r", encoding="utf-8") as f:
+            channels = json.load(f)
+        health = load_health(self.cache_file) if self.cache_file else None
+        started = time.perf_counter()
+        self.catalog = PlaylistCatalog(channels, health)
+        self.loaded_mtime = mtime
+        print(f"📥 Loaded {len(channels)} channels from {self.results_file} "
+              f"({len(self.catalog.precomputed)} responses precomputed in {time.perf_counter() - started:.2f}s)")
+
+    def current_catalog(self):
+        """The catalog, reloaded first if the results file changed"""
+        now = time.time()
+        if now - self.checked_at >= RELOAD_CHECK_INTERVAL and self.reload_lock.acquire(blocking=False):
+            try:
+                self.checked_at = now
+                try:
+                    if os.stat(self.results_file).st_mtime_ns != self.loaded_mtime:
+                        self.reload()
+                except (OSError, ValueError) as e:
+                    # Keep serving the last good results while the file is being replaced
+                    print(f"⚠️  Could not reload {self.results_file}: {e}")
+            finally:
+                self.reload_lock.release()
+        return self.catalog
+
+    def serve_forever(self):
+        print(f"🌐 Serving {self.results_file} on {self.url}/playlist.m3u")
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n👋 Stopped serving")
+        finally:
+            self.httpd.server_close()
+
+    def start(self):
+        """Serve on a background thread"""
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def _make_handler(server):
+    class PlaylistHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; don't let the body wait for an ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body=b"", content_type="text/plain; charset=utf-8", headers=(), send_body=True):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def do_HEAD(self):
+            self._serve(send_body=False)
+
+        def do_GET(self):
+            self._serve(send_body=True)
+
+        def _serve(self, send_body):
+            parts = urlsplit(self.path)
+            catalog = server.current_catalog()
+            if parts.path == "/index.json":
+                body = json.dumps(catalog.summary(), ensure_ascii=False, indent=2).encode("utf-8")
+                return self._send(200, body, "application/json", send_body=send_body)
+            if parts.path not in FORMATS:
+                return self._send(404, b"not found\n", send_body=send_body)
+            try:
+                query = parse_query(parts.query)
+            except ValueError as e:
+                return self._send(400, f"{e}\n".encode("utf-8"), send_body=send_body)
+
+            response = catalog.response(FORMATS[parts.path][0], query)
+            use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+            etag = response.gzip_etag if use_gzip else response.etag
+            headers = [("ETag", etag), ("Vary", "Accept-Encoding"), ("Cache-Control", "no-cache")]
+            if etag in self.headers.get("If-None-Match", ""):
+                self.send_response(304)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+            if use_gzip:
+                headers.append(("Content-Encoding", "gzip"))
+            body = response.gzipped if use_gzip else response.body
+            self._send(200, body, f"{response.content_type}; charset=utf-8", headers, send_body)
+
+    return PlaylistHandler
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve validated channels as filtered M3U/JSON playlists")
+    parser.add_argument("results_file", help="JSON output of a validator run (--format json)")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--cache", help="Probe cache to take channel health from (e.g. probe_cache.db)")
+
+    args = parser.parse_args()
+    PlaylistServer(args.results_file, cache_file=args.cache, host=args.host, port=args.port).serve_forever()
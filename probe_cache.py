@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Probe Cache - Remembers stream check results between validator runs
+"""
+
+import json, sqlite3, time
+from hls_probe import PERMANENT_FAILURES
+
+DEFAULT_CACHE_FILE = "probe_cache.db"
+
+# How long each kind of result stays fresh (seconds); a day and a bit, so a
+# nightly run reuses the last night's healthy results even if it starts late
+HEALTHY_TTL = 26 * 3600
+TRANSIENT_TTL = 30 * 60
+PERMANENT_TTL = 7 * 24 * 3600
+
+def result_ttl(result, healthy_ttl=HEALTHY_TTL):
+    """Return how long a probe result may be reused"""
+    if result["working"]:
+        return healthy_ttl
+    if result["failure"] in PERMANENT_FAILURES:
+        return PERMANENT_TTL
+    return TRANSIENT_TTL
+
+class ProbeCache:
+    """SQLite-backed store of probe results keyed by stream URL
+
+    Healthy results stay fresh for ``healthy_ttl`` seconds.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, healthy_ttl=HEALTHY_TTL):
+        self.path = path
+        self.healthy_ttl = healthy_ttl
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS probes (
+                url TEXT PRIMARY KEY,
+                working INTEGER NOT NULL,
+                failure TEXT,
+                latency REAL NOT NULL,
+                checked_at REAL NOT NULL,
+                media TEXT,
+                deep TEXT
+            )
+        """)
+        # Caches written before media or deep check reports were recorded lack the columns
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(probes)")}
+        for column in ("media", "deep"):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE probes ADD COLUMN {column} TEXT")
+        self.conn.commit()
+
+    def get(self, url):
+        """Return the stored result for a URL, or None"""
+        row = self.conn.execute(
+            "SELECT working, failure, latency, checked_at, media, deep FROM probes WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        result = {"working": bool(row[0]), "failure": row[1], "latency": row[2], "checked_at": row[3]}
+        if row[4]:
+            result["media"] = json.loads(row[4])
+        if row[5]:
+            result["deep"] = json.loads(row[5])
+        return result
+
+    def lookup_fresh(self, url, max_age=None, now=None):
+        """Return the cached result for a URL if it is still fresh, else None
+
+        A result is fresh while it is younger than the TTL for its kind and,
+        when ``max_age`` is given, younger than ``max_age`` seconds.
+        """
+        result = self.get(url)
+        if result is None:
+            return None
+        ttl = result_ttl(result, self.healthy_ttl)
+        if max_age is not None:
+            ttl = min(ttl, max_age)
+        if (now or time.time()) - result["checked_at"] < ttl:
+            return result
+        return None
+
+    def put(self, url, result):
+        """Store a probe result"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO probes (url, working, failure, latency, checked_at, media, deep) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, int(result["working"]), result["failure"], result["latency"], result["checked_at"],
+             json.dumps(result["media"]) if result.get("media") else None,
+             json.dumps(result["deep"]) if result.get("deep") else None)
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Proxy Pool - Spreads probes over several egress proxies and tracks their health
+"""
+
+import threading, time
+from hls_probe import FAILURE_FORBIDDEN, FAILURE_GEO_BLOCKED, FAILURE_PROXY
+
+STRATEGIES = ("round-robin", "least-loaded")
+
+# Consecutive failures through a proxy before it is evicted
+DEFAULT_EVICT_AFTER = 5
+
+# Evicted proxies are tried again after this long, and evicted again on their first failure
+DEFAULT_COOLDOWN = 300
+
+# Failures another egress might not see
+EGRESS_FAILURES = (FAILURE_FORBIDDEN, FAILURE_GEO_BLOCKED, FAILURE_PROXY)
+
+# Failures that count against the proxy a probe went through: only failing to
+# use the proxy itself. Dead, hanging or refusing origins (including tunnels the
+# proxy reports it could not open) are the streams' failures.
+PROXY_FAILURES = (FAILURE_PROXY,)
+
+# Weight of the newest latency in a proxy's moving average
+LATENCY_SMOOTHING = 0.2
+
+def load_proxies(source):
+    """Read proxy URLs from a file, one per line ('#' starts a comment)"""
+    proxies = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                proxies.append(line if "://" in line else f"http://{line}")
+    return proxies
+
+class ProxyPool:
+    """Hands out egress proxies round-robin or to the least loaded one
+
+    Each proxy's in-flight probes, average latency, probe and failure counts
+    are tracked. After ``evict_after`` consecutive failures to use the
+    proxy itself (see PROXY_FAILURES), or streams refused to it that another
+    proxy could reach (see ``blame``), a proxy is evicted for ``cooldown``
+    seconds, then gets one probe on probation. When every proxy is evicted the one due back soonest is
+    used anyway, so probes never silently go out directly. Safe to use from
+    several threads.
+    """
+
+    def __init__(self, proxies, strategy="round-robin", evict_after=DEFAULT_EVICT_AFTER, cooldown=DEFAULT_COOLDOWN):
+        if not proxies:
+            raise ValueError("a proxy pool needs at least one proxy")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown proxy strategy {strategy!r}, expected one of {', '.join(STRATEGIES)}")
+        self.strategy = strategy
+        self.evict_after = evict_after
+        self.cooldown = cooldown
+        self.stats = {proxy: {"in_flight": 0, "probes": 0, "failures": 0, "streak": 0, "latency": None,
+                              "evicted_until": 0.0, "evictions": 0, "probation": False}
+                      for proxy in dict.fromkeys(proxies)}
+        self.order = list(self.stats)
+        self.next = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.order)
+
+    def acquire(self, exclude=()):
+        """Pick a proxy for one probe, avoiding ``exclude``; None if every proxy is excluded"""
+        now = time.time()
+        with self.lock:
+            candidates = [proxy for proxy in self.order if proxy not in exclude]
+            if not candidates:
+                return None
+            healthy = [proxy for proxy in candidates if self.stats[proxy]["evicted_until"] <= now]
+            if not healthy:
+                proxy = min(candidates, key=lambda p: self.stats[p]["evicted_until"])
+            elif self.strategy == "least-loaded":
+                proxy = min(healthy, key=lambda p: (self.stats[p]["in_flight"], self.stats[p]["latency"] or 0))
+            else:
+                # Walk the ring from where the last pick stopped
+                for offset in range(len(self.order)):
+                    proxy = self.order[(self.next + offset) % len(self.order)]
+                    if proxy in healthy:
+                        self.next = (self.next + offset + 1) % len(self.order)
+                        break
+            self.stats[proxy]["in_flight"] += 1
+            return proxy
+
+    def release(self, proxy, result):
+        """Record the result of a probe made through ``proxy``
+
+        Returns True if this result evicted the proxy.
+        """
+        with self.lock:
+            stats = self.stats[proxy]
+            stats["in_flight"] -= 1
+            stats["probes"] += 1
+            if result["failure"] in PROXY_FAILURES:
+                return self._failed(stats)
+            stats["streak"] = 0
+            stats["probation"] = False
+            if stats["latency"] is None:
+                stats["latency"] = result["latency"]
+            else:
+                stats["latency"] += LATENCY_SMOOTHING * (result["latency"] - stats["latency"])
+            return False
+
+    def blame(self, proxy):
+        """Count a failure against a proxy after another egress got through where it did not
+
+        Returns True if this evicted the proxy.
+        """
+        with self.lock:
+            return self._failed(self.stats[proxy])
+
+    def _failed(self, stats):
+        stats["failures"] += 1
+        if stats["evicted_until"] > time.time():
+            # A probe that was already under way when the proxy was evicted
+            return False
+        stats["streak"] += 1
+        # A proxy back from eviction is evicted again on its first failure
+        if stats["streak"] >= self.evict_after or stats["probation"]:
+            stats["evicted_until"] = time.time() + self.cooldown
+            stats["evictions"] += 1
+            stats["streak"] = 0
+            stats["probation"] = True
+            return True
+        return False
+
+    def print_summary(self):
+        print("🌐 Proxies:")
+        for proxy in self.order:
+            stats = self.stats[proxy]
+            latency = f"{stats['latency'] * 1000:.0f} ms" if stats["latency"] is not None else "-"
+            state = "evicted" if stats["evicted_until"] > time.time() else "ok"
+            print(f"   {proxy}: {stats['probes']} probes, {stats['failures']} failures, avg {latency}, {state}")
+
+def proxy_settings(proxy):
+    """The requests-style proxies mapping for one proxy URL"""
+    return {"http": proxy, "https": proxy}
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Result Journal - Appends probe results to disk as they complete so runs can resume
+"""
+
+import json, os
+
+def journal_path(output_file):
+    """Default journal location for an output file"""
+    return output_file + ".journal.jsonl"
+
+class ResultJournal:
+    """Append-only JSONL file with one probe result per line"""
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.torn = False
+        self.done = self._load() if resume else {}
+        self.file = open(path, "a" if resume else "w", encoding="utf-8")
+        if self.torn:
+            # Start a fresh line so the next record is not glued to the torn one
+            self.file.write("\n")
+
+    def _load(self):
+        """Read results from an earlier run, ignoring a torn last line"""
+        done = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    self.torn = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    url = record.pop("url", None)
+                    if url:
+                        done[url] = record
+        except FileNotFoundError:
+            pass
+        return done
+
+    def record(self, url, result):
+        """Append a result and flush it so it survives the process being killed"""
+        self.file.write(json.dumps({"url": url, **result}, ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.done[url] = result
+
+    def close(self):
+        self.file.close()
+
+    def remove(self):
+        """Close and delete the journal once the final output is written"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Revalidation Queue - Decides which channels a watching validator should probe next
+"""
+
+import heapq, time
+from hls_probe import PERMANENT_FAILURES
+
+DEFAULT_MIN_INTERVAL = 60
+DEFAULT_MAX_INTERVAL = 6 * 3600
+
+# Categories worth noticing sooner; the check interval is multiplied by the weight
+DEFAULT_CATEGORY_WEIGHTS = {"News": 0.5, "Sports": 0.5}
+
+class RevalidationQueue:
+    """Priority queue of channels ordered by when their next probe is due
+
+    A channel that keeps giving the same result backs off exponentially
+    from ``min_interval`` up to ``max_interval``, so stable channels are
+    rarely probed. A channel whose result flips goes back to
+    ``min_interval``, and its flap score shortens later intervals until it
+    has been stable for a while. Permanent failures (404/403) wait the full
+    ``max_interval``. Channels never probed are due immediately.
+    """
+
+    def __init__(self, min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL,
+                 category_weights=None):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.category_weights = DEFAULT_CATEGORY_WEIGHTS if category_weights is None else category_weights
+        self.heap = []
+        self.channels = {}
+
+    def __len__(self):
+        return len(self.channels)
+
+    def __contains__(self, url):
+        return url in self.channels
+
+    def add(self, url, category=None, result=None, now=None):
+        """Track a channel, optionally seeded with an earlier result (e.g. from the cache)"""
+        if url in self.channels:
+            self.channels[url]["category"] = category
+            return
+        state = {"category": category, "working": None, "failure": None, "streak": 0, "flaps": 0.0, "due": 0.0}
+        self.channels[url] = state
+        if result is not None:
+            state["working"] = result["working"]
+            state["failure"] = result["failure"]
+            state["due"] = result["checked_at"] + self.interval(state)
+        else:
+            state["due"] = now or time.time()
+        heapq.heappush(self.heap, (state["due"], url))
+
+    def remove(self, url):
+        """Stop tracking a channel; its heap entry is skipped when reached"""
+        self.channels.pop(url, None)
+
+    def interval(self, state):
+        """Seconds until a channel in this state should be probed again"""
+        if state["working"] is False and state["failure"] in PERMANENT_FAILURES and not state["flaps"]:
+            return self.max_interval
+        interval = self.min_interval * 2 ** min(state["streak"], 32)
+        interval *= self.category_weights.get(state["category"], 1.0)
+        interval /= 1 + state["flaps"]
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def next_due(self):
+        """Time the earliest channel is due, or None when nothing is tracked"""
+        self._drop_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, limit, now=None):
+        """Take up to ``limit`` channels whose probe is due, most overdue first"""
+        now = now or time.time()
+        due = []
+        while len(due) < limit:
+            self._drop_stale()
+            if not self.heap or self.heap[0][0] > now:
+                break
+            due.append(heapq.heappop(self.heap)[1])
+        return due
+
+    def record(self, url, result, now=None):
+        """Reschedule a probed channel; returns True if its working state is new or changed"""
+        state = self.channels.get(url)
+        if state is None:
+            return False
+        changed = state["working"] is not None and state["working"] != result["working"]
+        if changed:
+            state["flaps"] += 1
+            state["streak"] = 0
+        else:
+            state["flaps"] /= 2
+            if state["flaps"] < 0.1:
+                state["flaps"] = 0.0
+            state["streak"] += 1
+        first = state["working"] is None
+        state["working"] = result["working"]
+        state["failure"] = result["failure"]
+        state["due"] = (now or time.time()) + self.interval(state)
+        heapq.heappush(self.heap, (state["due"], url))
+        return changed or first
+
+    def _drop_stale(self):
+        # Entries for removed channels, or superseded by a newer schedule, are discarded lazily
+        while self.heap:
+            due, url = self.heap[0]
+            state = self.channels.get(url)
+            if state is not None and state["due"] == due:
+                return
+            heapq.heappop(self.heap)
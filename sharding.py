@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Sharding - Splits a playlist's channels across several validator processes deterministically
+"""
+
+import hashlib
+from host_scheduler import stream_host
+
+def parse_shard(spec):
+    """Parse an ``i/N`` shard spec (1-based) into (index, count)"""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"shard must look like i/N, got {spec!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"shard {spec!r} is out of range")
+    return index, count
+
+def shard_of(url, count, key="host"):
+    """Return the 1-based shard a stream URL belongs to
+
+    Hashing the host (the default) keeps every channel of a host on the
+    same shard, so per-host limits and circuit breakers still hold across
+    machines. The hash is stable across processes and Python versions.
+    """
+    value = stream_host(url) if key == "host" else url
+    digest = hashlib.sha1(value.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+def iter_shard(entries, index, count, key="host"):
+    """Yield the (url, info) entries of one shard, tagging each with its playlist position
+
+    The position is the entry's place in the full sequence, so shard
+    outputs can be merged back into the original order.
+    """
+    for position, (url, info) in enumerate(entries):
+        if shard_of(url, count, key) == index:
+            info["position"] = position
+            yield url, info
@@ -7,21 +7,22 @@ Creates direct streaming links that can be pasted into VLC
 import json
 import webbrowser
 import os
-from hindi_validator_demo import validate_hindi_playlist_demo
+from hindi_validator_demo import demo_working_channels
 
-def create_direct_links(input_file, metadata_file="channels.yml"):
-    """Create direct streaming links for VLC"""
+def create_direct_links(input_file, metadata_file="channels.yml", channels=None,
+                        links_file="vlc_direct_links.txt", m3u_file="hindi_channels_direct.m3u"):
+    """Create direct streaming links for VLC
+
+    Pass ``channels`` (e.g. from a ChannelPipeline) to render an existing
+    result instead of running the demo pipeline on ``input_file``.
+    """
     
     print("🎬 Creating Direct VLC Streaming Links...")
     print("=" * 45)
     
     # Get Hindi channels
-    channels = validate_hindi_playlist_demo(
-        input_file, 
-        "temp.json", 
-        metadata_file=metadata_file, 
-        output_format="json"
-    )
+    if channels is None:
+        channels = demo_working_channels(input_file, metadata_file=metadata_file)
     
     if not channels:
         print("❌ No working channels found!")
@@ -54,12 +55,10 @@ def create_direct_links(input_file, metadata_file="channels.yml"):
         m3u_content += f"#EXTINF:-1,{title} [{country}] [{category}] [Hindi]\n{url}\n"
     
     # Save M3U file
-    m3u_file = "hindi_channels_direct.m3u"
     with open(m3u_file, "w", encoding='utf-8') as f:
         f.write(m3u_content)
     
     # Create text file with all links
-    links_file = "vlc_direct_links.txt"
     with open(links_file, "w", encoding='utf-8') as f:
         for url in vlc_links:
             f.write(url + "\n")
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Simulated HLS Origin - Local HTTP servers that serve fake live streams (and proxy them) for benchmarks
+"""
+
+import http.client, random, select, socket, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+SEGMENT_DURATION = 6
+SEGMENT_COUNT = 3
+
+class OriginProfile:
+    """How a simulated origin behaves
+
+    Each channel's fate is drawn once from its number, so a channel behaves
+    the same on every request and every run with the same seed.
+    """
+
+    def __init__(self, latency=0.02, jitter=0.01, not_found=0.0, forbidden=0.0, hang=0.0,
+                 slow=0.0, hang_seconds=30.0, slow_seconds=2.0, segment_bytes=188 * 100, seed=0, english=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.not_found = not_found
+        self.forbidden = forbidden
+        self.hang = hang
+        self.slow = slow
+        self.english = english
+        self.hang_seconds = hang_seconds
+        self.slow_seconds = slow_seconds
+        self.segment_bytes = segment_bytes
+        self.seed = seed
+
+    def fate(self, channel):
+        """Return 'not_found', 'forbidden', 'hang', 'slow', 'english' or 'ok' for a channel number
+
+        An 'english' channel plays fine but tags its audio as English instead of Hindi.
+        """
+        roll = random.Random(channel * 7919 + self.seed).random()
+        for fate, rate in (("not_found", self.not_found), ("forbidden", self.forbidden),
+                           ("hang", self.hang), ("slow", self.slow), ("english", self.english)):
+            if roll < rate:
+                return fate
+            roll -= rate
+        return "ok"
+
+def _make_handler(profile, stats):
+    class OriginHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_HEAD(self):
+            self._serve(send_body=False)
+
+        def do_GET(self):
+            self._serve(send_body=True)
+
+        def _reply(self, status, body=b"", content_type="application/vnd.apple.mpegurl", send_body=True):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def _serve(self, send_body):
+            with stats["lock"]:
+                stats["requests"] += 1
+            time.sleep(max(0.0, profile.latency + random.uniform(-profile.jitter, profile.jitter)))
+
+            # Paths look like /c/<channel>/master.m3u8, /c/<channel>/v.m3u8, /c/<channel>/s<n>.ts
+            parts = self.path.split("?")[0].strip("/").split("/")
+            if len(parts) != 3 or parts[0] != "c" or not parts[1].isdigit():
+                return self._reply(404, send_body=send_body)
+            fate = profile.fate(int(parts[1]))
+            name = parts[2]
+
+            if fate == "not_found":
+                return self._reply(404, send_body=send_body)
+            if fate == "forbidden":
+                return self._reply(403, send_body=send_body)
+            if fate == "hang":
+                time.sleep(profile.hang_seconds)
+
+            if name == "master.m3u8":
+                language = "eng" if fate == "english" else "hin"
+                body = (f'#EXTM3U\n#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="aac",NAME="Audio",LANGUAGE="{language}",DEFAULT=YES\n'
+                        f'#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360,CODECS="avc1.4d401e,mp4a.40.2",AUDIO="aac"\n'
+                        f'v.m3u8\n').encode()
+                return self._reply(200, body, send_body=send_body)
+            if name == "v.m3u8":
+                lines = ["#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{SEGMENT_DURATION}",
+                         "#EXT-X-MEDIA-SEQUENCE:0"]
+                for n in range(SEGMENT_COUNT):
+                    lines += [f"#EXTINF:{SEGMENT_DURATION}.0,", f"s{n}.ts"]
+                return self._reply(200, ("\n".join(lines) + "\n").encode(), send_body=send_body)
+            if name.startswith("s") and name.endswith(".ts"):
+                if fate == "slow":
+                    time.sleep(profile.slow_seconds)
+                return self._reply(200, b"\x47" * profile.segment_bytes, content_type="video/mp2t",
+                                   send_body=send_body)
+            return self._reply(404, send_body=send_body)
+
+    return OriginHandler
+
+class SimulatedOrigin:
+    """A local HLS origin running on a background thread
+
+    Use as a context manager; ``channel_url(n)`` gives the master playlist
+    URL of channel ``n``, using ``name`` (e.g. "localhost") instead of the
+    bound address when given, so clients have a host name to resolve.
+    """
+
+    def __init__(self, profile=None, host="127.0.0.1", port=0, name=None):
+        self.profile = profile or OriginProfile()
+        self.name = name
+        self.stats = {"requests": 0, "lock": threading.Lock()}
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self.profile, self.stats))
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{self.name or host}:{port}"
+
+    def channel_url(self, channel):
+        return f"{self.base_url}/c/{channel}/master.m3u8"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def _splice(client, upstream, idle=60):
+    """Copy bytes both ways between two sockets until either side closes or both stay idle"""
+    peers = {client: upstream, upstream: client}
+    while True:
+        readable, _, _ = select.select(list(peers), [], [], idle)
+        if not readable:
+            return
+        for sock in readable:
+            try:
+                data = sock.recv(64 * 1024)
+                if not data:
+                    return
+                peers[sock].sendall(data)
+            except OSError:
+                return
+
+def _make_proxy_handler(proxy):
+    class ProxyHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_HEAD(self):
+            self._forward("HEAD")
+
+        def do_GET(self):
+            self._forward("GET")
+
+        def do_CONNECT(self):
+            with proxy.stats["lock"]:
+                proxy.stats["requests"] += 1
+            if proxy.blocked:
+                return self._reply(403, send_body=False)
+            host, _, port = self.path.rpartition(":")
+            try:
+                upstream = socket.create_connection((host, int(port)), timeout=10)
+            except (OSError, ValueError):
+                # As real proxies do, an unreachable origin fails the tunnel with a 502
+                return self._reply(502, send_body=False)
+            self.send_response(200, "Connection Established")
+            self.end_headers()
+            self.close_connection = True
+            with upstream:
+                _splice(self.connection, upstream)
+
+        def _reply(self, status, body=b"", content_type="text/plain", send_body=True):
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client timed out before the origin answered
+                self.close_connection = True
+
+        def _forward(self, method):
+            with proxy.stats["lock"]:
+                proxy.stats["requests"] += 1
+            send_body = method == "GET"
+            if proxy.blocked:
+                # Looks like the origin refusing this egress's country
+                return self._reply(403, b"blocked in your region", send_body=send_body)
+            parts = urlsplit(self.path)
+            if parts.scheme != "http" or not parts.hostname:
+                return self._reply(400, send_body=send_body)
+            with proxy.slots:
+                time.sleep(proxy.latency)
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+                try:
+                    conn.request(method, parts.path + (f"?{parts.query}" if parts.query else ""))
+                    response = conn.getresponse()
+                    body = response.read()
+                except OSError:
+                    return self._reply(502, send_body=send_body)
+                finally:
+                    conn.close()
+            self._reply(response.status, body, response.getheader("Content-Type", "application/octet-stream"),
+                        send_body=send_body)
+
+    return ProxyHandler
+
+class SimulatedProxy:
+    """A local forward HTTP proxy standing in for one egress path
+
+    At most ``capacity`` requests are forwarded at once, each after
+    ``latency`` seconds, so a pool of these scales like real egress
+    links. HTTPS goes through CONNECT tunnels, which fail with a 502 when
+    the origin cannot be reached. A ``blocked`` proxy answers 403 to
+    everything, like an egress in a geo-blocked country. Use as a context manager; ``url`` is what
+    goes in a proxy list.
+    """
+
+    def __init__(self, latency=0.0, capacity=4, blocked=False, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.blocked = blocked
+        self.slots = threading.BoundedSemaphore(capacity)
+        self.stats = {"requests": 0, "lock": threading.Lock()}
+        self.server = ThreadingHTTPServer((host, port), _make_proxy_handler(self))
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
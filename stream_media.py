@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Stream Media - Codecs, resolution, bitrate and audio languages reported by a probe
+"""
+
+import json
+
+# Keep ffprobe's analysis bounded: read at most this many bytes / microseconds of the stream
+FFPROBE_PROBESIZE = 1000000
+FFPROBE_ANALYZEDURATION = 2000000
+
+# One ffprobe call answers both "alive?" and "what is in it?"
+FFPROBE_ENTRIES = ("format=format_name,bit_rate:"
+                   "stream=codec_type,codec_name,width,height,bit_rate:"
+                   "stream_tags=language")
+
+# Audio language tags that mean Hindi (ISO 639-2 and 639-1, plus spelled out)
+HINDI_LANGUAGE_CODES = {"hin", "hi", "hindi"}
+
+# Tags that say nothing about the language
+UNKNOWN_LANGUAGE_CODES = {"und", "unk", "mul", "zxx", "mis", ""}
+
+# HLS CODECS attribute prefixes and the names ffprobe uses for them
+HLS_CODECS = {
+    "avc1": "h264", "avc3": "h264", "hvc1": "hevc", "hev1": "hevc", "av01": "av1", "vp09": "vp9",
+    "mp4a": "aac", "ac-3": "ac3", "ec-3": "eac3", "opus": "opus", "mp3": "mp3"
+}
+
+def ffprobe_media_args():
+    """ffprobe arguments that cap the analysis and select the media entries parse_ffprobe_media reads"""
+    return ["-probesize", str(FFPROBE_PROBESIZE), "-analyzeduration", str(FFPROBE_ANALYZEDURATION),
+            "-show_entries", FFPROBE_ENTRIES, "-print_format", "json"]
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _media(format_name=None, bitrate=None, video_codec=None, width=None, height=None, audio_codecs=(),
+           languages=()):
+    """Build a media record, leaving out what is unknown"""
+    media = {
+        "format": format_name,
+        "bitrate": bitrate,
+        "video_codec": video_codec,
+        "resolution": f"{width}x{height}" if width and height else None,
+        "audio_codecs": list(dict.fromkeys(audio_codecs)),
+        "languages": list(dict.fromkeys(language.lower() for language in languages if language)),
+    }
+    return {key: value for key, value in media.items() if value}
+
+def parse_ffprobe_media(output):
+    """Turn ffprobe's JSON output into a media record; {} if it cannot be read"""
+    try:
+        report = json.loads(output or "{}")
+    except ValueError:
+        return {}
+    streams = report.get("streams") or []
+    video = [stream for stream in streams if stream.get("codec_type") == "video"]
+    audio = [stream for stream in streams if stream.get("codec_type") == "audio"]
+    # HLS masters list every variant; describe the largest picture
+    best = max(video, key=lambda stream: (stream.get("width") or 0) * (stream.get("height") or 0), default={})
+    return _media(
+        format_name=(report.get("format") or {}).get("format_name"),
+        bitrate=_int((report.get("format") or {}).get("bit_rate")) or _int(best.get("bit_rate")),
+        video_codec=best.get("codec_name"),
+        width=best.get("width"),
+        height=best.get("height"),
+        audio_codecs=[stream["codec_name"] for stream in audio if stream.get("codec_name")],
+        languages=[(stream.get("tags") or {}).get("language") for stream in audio],
+    )
+
+def _hls_codec(codec):
+    return HLS_CODECS.get(codec.split(".")[0].strip().lower())
+
+def hls_master_media(playlist):
+    """A media record from an HLS master playlist's variants and EXT-X-MEDIA audio renditions"""
+    video_codec = None
+    audio_codecs = []
+    best = max(playlist.playlists, key=lambda variant: variant.stream_info.bandwidth or 0, default=None)
+    width = height = bitrate = None
+    if best is not None:
+        info = best.stream_info
+        bitrate = info.bandwidth
+        if info.resolution:
+            width, height = info.resolution
+        for codec in (info.codecs or "").split(","):
+            name = _hls_codec(codec)
+            if name in ("h264", "hevc", "av1", "vp9"):
+                video_codec = video_codec or name
+            elif name:
+                audio_codecs.append(name)
+    audio = [media for media in playlist.media if (media.type or "").upper() == "AUDIO"]
+    return _media(format_name="hls", bitrate=bitrate, video_codec=video_codec, width=width, height=height,
+                  audio_codecs=audio_codecs, languages=[media.language for media in audio])
+
+def is_hindi_audio(media):
+    """True if a tagged audio track is Hindi, False if tracks are tagged but none is, None if untagged"""
+    languages = [language for language in (media or {}).get("languages", ())
+                 if language not in UNKNOWN_LANGUAGE_CODES]
+    if not languages:
+        return None
+    return any(language in HINDI_LANGUAGE_CODES for language in languages)
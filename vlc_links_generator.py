@@ -6,89 +6,74 @@ Creates direct streaming links that can be pasted into VLC
 
 import json
 import webbrowser
-from urllib.parse import quote
-from hindi_validator_demo import validate_hindi_playlist_demo
+from hindi_validator_demo import demo_working_channels
 
-def generate_vlc_links(input_file, metadata_file="channels.yml"):
-    """Generate direct VLC streaming links"""
-    
-    print("🎬 Generating VLC Direct Stream Links...")
-    print("=" * 50)
-    
-    # Get Hindi channels
-    channels = validate_hindi_playlist_demo(
-        input_file, 
-        "temp_output.json", 
-        metadata_file=metadata_file, 
-        output_format="json"
-    )
-    
-    # Generate HTML page with direct links
-    html_content = f"""
-<!DOCTYPE html>
+PAGE_HEAD = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Hindi IPTV Channels - Direct VLC Links</title>
     <style>
-        body {{
+        body {
             font-family: Arial, sans-serif;
             max-width: 1200px;
             margin: 0 auto;
             padding: 20px;
             background-color: #f5f5f5;
-        }}
-        .header {{
+        }
+        .header {
             text-align: center;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 30px;
             border-radius: 10px;
             margin-bottom: 30px;
-        }}
-        .category {{
+        }
+        .category {
             margin-bottom: 30px;
             background: white;
             border-radius: 10px;
             padding: 20px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .category h2 {{
+        }
+        .category summary {
             color: #333;
+            font-size: 1.5em;
+            font-weight: bold;
+            cursor: pointer;
             border-bottom: 3px solid #667eea;
             padding-bottom: 10px;
-            margin-top: 0;
-        }}
-        .channel-grid {{
+        }
+        .channel-grid {
             display: grid;
             grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
             gap: 15px;
             margin-top: 20px;
-        }}
-        .channel {{
+        }
+        .channel {
             background: #f8f9fa;
             border: 1px solid #e1e5e9;
             border-radius: 8px;
             padding: 15px;
             transition: all 0.3s ease;
-        }}
-        .channel:hover {{
+        }
+        .channel:hover {
             transform: translateY(-2px);
             box-shadow: 0 4px 15px rgba(0,0,0,0.15);
-        }}
-        .channel-title {{
+        }
+        .channel-title {
             font-weight: bold;
             color: #333;
             margin-bottom: 8px;
             font-size: 16px;
-        }}
-        .channel-meta {{
+        }
+        .channel-meta {
             color: #666;
             font-size: 12px;
             margin-bottom: 10px;
-        }}
-        .vlc-link {{
+        }
+        .vlc-link {
             display: inline-block;
             background: #667eea;
             color: white;
@@ -97,18 +82,18 @@ def generate_vlc_links(input_file, metadata_file="channels.yml"):
             border-radius: 5px;
             font-size: 14px;
             transition: background 0.3s ease;
-        }}
-        .vlc-link:hover {{
+        }
+        .vlc-link:hover {
             background: #5a67d8;
-        }}
-        .stats {{
+        }
+        .stats {
             background: #e8f5e8;
             padding: 15px;
             border-radius: 8px;
             margin-bottom: 20px;
             text-align: center;
-        }}
-        .copy-all {{
+        }
+        .copy-all, .show-more {
             background: #28a745;
             color: white;
             border: none;
@@ -117,26 +102,23 @@ def generate_vlc_links(input_file, metadata_file="channels.yml"):
             font-size: 16px;
             cursor: pointer;
             margin: 10px;
-        }}
-        .copy-all:hover {{
+        }
+        .copy-all:hover, .show-more:hover {
             background: #218838;
-        }}
-        .instructions {{
+        }
+        .instructions {
             background: #fff3cd;
             border: 1px solid #ffeaa7;
             border-radius: 8px;
             padding: 15px;
             margin-bottom: 20px;
-        }}
+        }
     </style>
 </head>
 <body>
-    <div class="header">
-        <h1>🇮🇳 Hindi IPTV Channels</h1>
-        <h3>Direct VLC Streaming Links - {len(channels)} Working Channels</h3>
-        <p>Click any channel to open directly in VLC, or copy all links for batch import</p>
-    </div>
+"""
 
+PAGE_BODY = """
     <div class="instructions">
         <h3>📋 How to Use These Links:</h3>
         <ol>
@@ -150,56 +132,91 @@ def generate_vlc_links(input_file, metadata_file="channels.yml"):
         <button class="copy-all" onclick="copyAllLinks()">📋 Copy All VLC Links</button>
         <button class="copy-all" onclick="downloadM3U()">⬇️ Download M3U File</button>
     </div>
+
+    <div id="categories"></div>
 """
-    
-    # Group channels by category
-    categories = {}
-    for url, info in channels.items():
-        category = info.get('category', 'Unknown')
-        if category not in categories:
-            categories[category] = []
-        categories[category].append((info['title'], url, info.get('country', 'IN')))
-    
-    # Generate category sections
-    for category, channel_list in sorted(categories.items()):
-        html_content += f"""
-    <div class="category">
-        <h2>📺 {category} ({len(channel_list)} channels)</h2>
-        <div class="channel-grid">
-"""
-        
-        for title, url, country in channel_list:
-            vlc_url = url
-            html_content += f"""
-            <div class="channel">
-                <div class="channel-title">{title}</div>
-                <div class="channel-meta">🇮🇳 {country} • {category}</div>
-                <a href="{vlc_url}" class="vlc-link" target="_blank">📺 Open in VLC</a>
-            </div>
-"""
-        
-        html_content += """
-        </div>
-    </div>
-"""
-    
-    # Add JavaScript functions
-    all_links = [url for url, info in channels.items()]
-    m3u_content = "#EXTM3U\n"
-    for url, info in channels.items():
-        m3u_content += f"#EXTINF:-1,{info['title']} [{info['country']}] [{info['category']}] [Hindi]\n{url}\n"
-    
-    html_content += """
+
+# Channels are rendered from the embedded JSON: a category's cards are only
+# built when it is opened, PAGE_SIZE at a time
+PAGE_SCRIPT = """
     <script>
+        const DATA = JSON.parse(document.getElementById('channel-data').textContent);
+        const PAGE_SIZE = 200;
+        const PLAYABLE = /^(https?|rtmp|rtsp|rtp|udp|mms):/i;
+
+        function channelCard(channel) {
+            const [title, url, country] = channel;
+            const card = document.createElement('div');
+            card.className = 'channel';
+            const name = document.createElement('div');
+            name.className = 'channel-title';
+            name.textContent = title;
+            const meta = document.createElement('div');
+            meta.className = 'channel-meta';
+            meta.textContent = `🇮🇳 ${country} • ${DATA.categories[channel[3]]}`;
+            const link = document.createElement('a');
+            link.className = 'vlc-link';
+            link.target = '_blank';
+            link.textContent = '📺 Open in VLC';
+            if (PLAYABLE.test(url)) {
+                link.href = url;
+            }
+            card.append(name, meta, link);
+            return card;
+        }
+
+        function renderPage(section, channels) {
+            const grid = section.querySelector('.channel-grid');
+            const start = grid.childElementCount;
+            const fragment = document.createDocumentFragment();
+            channels.slice(start, start + PAGE_SIZE).forEach(channel => fragment.appendChild(channelCard(channel)));
+            grid.appendChild(fragment);
+            section.querySelector('.show-more').hidden = grid.childElementCount >= channels.length;
+        }
+
+        function buildSections() {
+            const groups = DATA.categories.map(() => []);
+            DATA.channels.forEach(channel => groups[channel[3]].push(channel));
+            const order = DATA.categories.map((name, index) => index)
+                .sort((a, b) => DATA.categories[a].localeCompare(DATA.categories[b]));
+            const container = document.getElementById('categories');
+            order.forEach(index => {
+                const channels = groups[index];
+                const section = document.createElement('details');
+                section.className = 'category';
+                const summary = document.createElement('summary');
+                summary.textContent = `📺 ${DATA.categories[index]} (${channels.length} channels)`;
+                const grid = document.createElement('div');
+                grid.className = 'channel-grid';
+                const more = document.createElement('button');
+                more.className = 'show-more';
+                more.textContent = 'Show more';
+                more.hidden = true;
+                more.onclick = () => renderPage(section, channels);
+                section.append(summary, grid, more);
+                section.addEventListener('toggle', () => {
+                    if (section.open && !grid.childElementCount) {
+                        renderPage(section, channels);
+                    }
+                });
+                container.appendChild(section);
+            });
+            if (container.firstChild) {
+                container.firstChild.open = true;
+            }
+        }
+
         function copyAllLinks() {
-            const links = `""" + json.dumps(all_links) + """`;
-            navigator.clipboard.writeText(JSON.parse(links).join('\\n'));
-            alert('✅ All """ + str(len(all_links)) + """ VLC links copied to clipboard!');
+            navigator.clipboard.writeText(DATA.channels.map(channel => channel[1]).join('\\n'));
+            alert(`✅ All ${DATA.channels.length} VLC links copied to clipboard!`);
         }
-        
+
         function downloadM3U() {
-            const m3uContent = `""" + m3u_content.replace('`', '\\`') + """`;
-            const blob = new Blob([m3uContent], { type: 'text/plain' });
+            const lines = ['#EXTM3U'];
+            DATA.channels.forEach(([title, url, country, category]) => {
+                lines.push(`#EXTINF:-1,${title} [${country}] [${DATA.categories[category]}] [Hindi]`, url);
+            });
+            const blob = new Blob([lines.join('\\n') + '\\n'], { type: 'text/plain' });
             const url = URL.createObjectURL(blob);
             const a = document.createElement('a');
             a.href = url;
@@ -209,20 +226,71 @@ def generate_vlc_links(input_file, metadata_file="channels.yml"):
             document.body.removeChild(a);
             URL.revokeObjectURL(url);
         }
+
+        buildSections();
     </script>
 </body>
 </html>
 """
+
+def _script_json(value):
+    """Compact JSON that is safe inside a <script> element"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).replace("<", "\\u003c")
+
+def render_vlc_html(channels, f):
+    """Stream the VLC links page for channels into the open text file f
+
+    Channel data is embedded once as compact JSON and the category sections
+    are built in the browser, so the page grows linearly with the channels.
+    """
+    f.write(PAGE_HEAD)
+    f.write(f"""    <div class="header">
+        <h1>🇮🇳 Hindi IPTV Channels</h1>
+        <h3>Direct VLC Streaming Links - {len(channels)} Working Channels</h3>
+        <p>Click any channel to open directly in VLC, or copy all links for batch import</p>
+    </div>
+""")
+    f.write(PAGE_BODY)
+
+    # Each channel is [title, url, country, category index]
+    categories = {}
+    f.write('    <script type="application/json" id="channel-data">{"channels":[')
+    for i, (url, info) in enumerate(channels.items()):
+        category = categories.setdefault(info.get('category', 'Unknown'), len(categories))
+        if i:
+            f.write(",")
+        f.write(_script_json([info['title'], url, info.get('country', 'IN'), category]))
+    f.write('],"categories":' + _script_json(list(categories)) + '}</script>\n')
+    f.write(PAGE_SCRIPT)
+
+def write_vlc_m3u(channels, f):
+    """Stream channels as a simple M3U playlist into the open text file f"""
+    f.write("#EXTM3U\n")
+    for url, info in channels.items():
+        f.write(f"#EXTINF:-1,{info['title']} [{info['country']}] [{info['category']}] [Hindi]\n{url}\n")
+
+def generate_vlc_links(input_file, metadata_file="channels.yml", channels=None,
+                       html_file="vlc_hindi_channels.html", m3u_file="hindi_channels_vlc.m3u", open_browser=True):
+    """Generate direct VLC streaming links
+
+    Pass ``channels`` (e.g. from a ChannelPipeline) to render an existing
+    result instead of running the demo pipeline on ``input_file``.
+    """
+    
+    print("🎬 Generating VLC Direct Stream Links...")
+    print("=" * 50)
+    
+    # Get Hindi channels
+    if channels is None:
+        channels = demo_working_channels(input_file, metadata_file=metadata_file)
     
     # Save HTML file
-    html_file = "vlc_hindi_channels.html"
     with open(html_file, "w", encoding='utf-8') as f:
-        f.write(html_content)
+        render_vlc_html(channels, f)
     
     # Save M3U file
-    m3u_file = "hindi_channels_vlc.m3u"
     with open(m3u_file, "w", encoding='utf-8') as f:
-        f.write(m3u_content)
+        write_vlc_m3u(channels, f)
     
     print(f"\n🎉 Success! Generated files:")
     print(f"   📄 {html_file} - Interactive web page with VLC links")
@@ -230,6 +298,8 @@ def generate_vlc_links(input_file, metadata_file="channels.yml"):
     print(f"   📊 {len(channels)} working Hindi channels")
     
     # Open in browser
+    if not open_browser:
+        return html_file, m3u_file
     try:
         import os
         file_path = os.path.abspath(html_file)